@@ -0,0 +1,185 @@
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def load_anchor_bank(path):
+    """
+    Reads risk anchors from a CSV with `text`, `category` and
+    `language` columns. Blank rows are skipped.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            {
+                "text": row["text"].strip(),
+                "category": (row.get("category") or "uncategorized").strip(),
+                "language": (row.get("language") or "en").strip()
+            }
+            for row in csv.DictReader(f)
+            if row.get("text") and row["text"].strip()
+        ]
+
+
+class AnchorIndex:
+    """
+    Normalized anchor embeddings stored as a compact (float16 or int8)
+    matrix on disk and memory-mapped at load time.
+
+    `search` scores a batch of query embeddings against every anchor,
+    checks every score against its category threshold and returns the
+    strongest anchor above its threshold plus the top-k anchors per
+    query for reporting.
+
+    Banks up to `block_rows` anchors are widened to float32 once and
+    kept; larger ones are multiplied in blocks of that many rows, so a
+    search never holds more than one float32 block of the bank.
+    """
+
+    DTYPES = ("float16", "int8")
+
+    def __init__(self, anchors, matrix, scales=None, thresholds=None, default_threshold=0.68, block_rows=4096):
+        self.anchors = anchors
+        self.matrix = matrix
+        self.scales = scales
+        self.thresholds = thresholds or {}
+        self.default_threshold = default_threshold
+        self.block_rows = block_rows
+
+        self.anchor_thresholds = [self.threshold_for(a["category"]) for a in anchors]
+        self.threshold_array = np.asarray(self.anchor_thresholds, dtype=np.float64)
+
+        self.dense = (
+            np.asarray(matrix, dtype=np.float32)
+            if len(matrix) <= block_rows else None
+        )
+
+    def threshold_for(self, category):
+        return self.thresholds.get(category, self.default_threshold)
+
+    @staticmethod
+    def version(anchors, model_name, dtype):
+        payload = json.dumps(
+            {"model": model_name, "dtype": dtype, "anchors": anchors},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def build(cls, anchors, encode, model_name, path, dtype="float16"):
+        """
+        Encodes anchors with `encode(texts) -> np.ndarray`, normalizes
+        and compresses them, and writes `<path>.npy` plus `<path>.json`.
+        """
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"Unsupported anchor dtype: {dtype}")
+
+        embeddings = np.asarray(encode([a["text"] for a in anchors]), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        scales = None
+        if dtype == "int8":
+            scales = np.abs(embeddings).max(axis=1) / 127
+            scales = np.maximum(scales, 1e-12)
+            matrix = np.round(embeddings / scales[:, None]).astype(np.int8)
+        else:
+            matrix = embeddings.astype(np.float16)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(f"{path}.npy", matrix)
+
+        meta = {
+            "version": cls.version(anchors, model_name, dtype),
+            "model": model_name,
+            "dtype": dtype,
+            "anchors": anchors,
+            "scales": scales.tolist() if scales is not None else None
+        }
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        matrix = np.load(f"{path}.npy", mmap_mode="r")
+        scales = np.asarray(meta["scales"], dtype=np.float32) if meta["scales"] else None
+
+        return cls(meta["anchors"], matrix, scales=scales, **kwargs)
+
+    @classmethod
+    def stored_version(cls, path):
+        try:
+            with open(f"{path}.json", encoding="utf-8") as f:
+                return json.load(f).get("version")
+        except (OSError, ValueError):
+            return None
+
+    def scores(self, queries):
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.maximum(norms, 1e-12)
+
+        if self.dense is not None:
+            scores = queries @ self.dense.T
+        else:
+            scores = np.empty((len(queries), len(self.matrix)), dtype=np.float32)
+            for start in range(0, len(self.matrix), self.block_rows):
+                block = np.asarray(self.matrix[start:start + self.block_rows], dtype=np.float32)
+                scores[:, start:start + len(block)] = queries @ block.T
+
+        if self.scales is not None:
+            scores = scores * self.scales[None, :]
+
+        return scores
+
+    def match(self, i, score):
+        return {
+            **self.anchors[i],
+            "score": round(float(score), 4),
+            "threshold": self.anchor_thresholds[i]
+        }
+
+    def search(self, queries, k=5):
+        """
+        Per query: `trigger`, the highest-scoring anchor whose raw score
+        exceeds its category threshold (None if no anchor does), and
+        `matches`, the top-k anchors. Thresholds are checked over every
+        anchor, not just the top-k, and scores are rounded only in the
+        returned entries.
+        """
+        scores = self.scores(queries)
+        if not scores.shape[1]:
+            return [{"trigger": None, "matches": []} for _ in scores]
+
+        k = min(k, scores.shape[1])
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        above = scores.astype(np.float64) > self.threshold_array[None, :]
+        strongest = np.where(above, scores, -np.inf).argmax(axis=1)
+
+        results = []
+        for row, indices in enumerate(top):
+            best = strongest[row]
+            results.append({
+                "trigger": self.match(best, scores[row, best]) if above[row, best] else None,
+                "matches": [self.match(i, scores[row, i]) for i in indices]
+            })
+
+        return results
@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Collects single-item calls from concurrent request threads and runs
+    them through `batch_fn` together.
+
+    A batch is flushed as soon as `max_batch_size` items are waiting or
+    the oldest item has waited `max_wait_ms`. `batch_fn` takes a list of
+    inputs and must return a list of outputs in the same order. If a
+    batch fails, its items are retried one by one so a single bad input
+    only fails its own caller.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=10, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._size_counts = {}
+
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The worker thread does not survive fork(); a forked server
+        # worker starts its own on first submit
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker = None
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            # Also replaces a worker that died, so callers never queue
+            # behind a thread that is gone
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name=f"{self.name}-worker",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, item) -> Future:
+        if self._worker is None or not self._worker.is_alive():
+            self._ensure_worker()
+
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        return self.submit(item).result()
+
+    def _collect(self):
+        batch = []
+        deadline = None
+
+        while len(batch) < self.max_batch_size:
+            if deadline is None:
+                entry = self._queue.get()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            # Callers that gave up (e.g. a disconnected client) are dropped
+            # here; a cancelled future cannot take a result
+            if not entry[1].set_running_or_notify_cancel():
+                continue
+
+            batch.append(entry)
+            if deadline is None:
+                deadline = time.monotonic() + self.max_wait
+
+        return batch
+
+    @staticmethod
+    def _resolve(future, output=None, exc=None):
+        try:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(output)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._collect()
+                self._run_batch(batch)
+                self._record(len(batch))
+            except Exception:
+                # Never let the worker exit: every later submit would hang
+                logger.exception("Micro-batch worker error", extra={"batcher": self.name})
+
+    def _run_batch(self, batch):
+        inputs = [item for item, _ in batch]
+
+        try:
+            outputs = self.batch_fn(inputs)
+        except Exception as exc:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exc=exc)
+                return
+
+            # Retry individually so only the offending input fails
+            for item, future in batch:
+                try:
+                    output = self.batch_fn([item])[0]
+                except Exception as item_exc:
+                    self._resolve(future, exc=item_exc)
+                else:
+                    self._resolve(future, output)
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            self._resolve(future, output)
+
+    def _record(self, size):
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._max_seen = max(self._max_seen, size)
+            self._size_counts[size] = self._size_counts.get(size, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+                "largest_batch": self._max_seen,
+                "batch_size_counts": dict(sorted(self._size_counts.items()))
+            }
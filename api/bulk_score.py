@@ -0,0 +1,266 @@
+"""
+Offline bulk scoring through the same pipeline as /analyze, without HTTP.
+
+    python -m api.bulk_score data/raw/drugLibTrain_raw.tsv --text-column benefitsReview --out scores/druglib_train
+    python -m api.bulk_score requests.jsonl --text-column body --out scores/requests --workers 4
+
+Input (.tsv, .csv or .jsonl) is streamed in chunks of --chunk-size rows.
+Chunks are scored on a process pool whose workers load the models once,
+and each finished chunk is written as its own Parquet part file under
+--out. Rerunning the same command skips chunks already written, so an
+interrupted run resumes where it stopped. Needs pandas and pyarrow.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from multiprocessing import get_context
+
+import pandas as pd
+
+from api.threads import thread_budget
+
+logger = logging.getLogger("api.bulk_score")
+
+TEXT_COLUMN_CANDIDATES = ["text", "body", "benefitsReview", "commentsReview"]
+
+OUTPUT_COLUMNS = [
+    "row", "id", "text", "language", "translated",
+    "sentiment", "confidence", "severity", "severity_reason", "error"
+]
+
+
+def read_chunks(path, chunk_size):
+    """Yields DataFrames of up to `chunk_size` rows from a TSV, CSV or JSONL file."""
+    if path.endswith(".jsonl"):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif path.endswith(".tsv"):
+        yield from pd.read_csv(path, sep="\t", chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def pick_text_column(columns, requested=None):
+    if requested:
+        if requested not in columns:
+            raise SystemExit(f"Column {requested!r} not found; available: {list(columns)}")
+        return requested
+
+    for candidate in TEXT_COLUMN_CANDIDATES:
+        if candidate in columns:
+            return candidate
+
+    raise SystemExit(f"No text column found; pass --text-column (available: {list(columns)})")
+
+
+def part_path(out_dir, chunk_id):
+    return os.path.join(out_dir, f"part-{chunk_id:06d}.parquet")
+
+
+def run_signature(args):
+    """Identifies a run so a checkpoint is never resumed with different inputs."""
+    stat = os.stat(args.input)
+    payload = json.dumps({
+        "input": os.path.abspath(args.input),
+        "size": stat.st_size,
+        "mtime": int(stat.st_mtime),
+        "chunk_size": args.chunk_size,
+        "text_column": args.text_column,
+        "id_column": args.id_column,
+        "language": args.language
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(out_dir, signature):
+    path = os.path.join(out_dir, "_checkpoint.json")
+
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("signature") != signature:
+        raise SystemExit(
+            f"{out_dir} holds a run with different input or options; "
+            "use a new --out directory or delete it"
+        )
+
+    # Only trust chunks whose part file actually made it to disk
+    return {
+        chunk_id for chunk_id in checkpoint.get("completed", [])
+        if os.path.exists(part_path(out_dir, chunk_id))
+    }
+
+
+def save_checkpoint(out_dir, signature, completed):
+    path = os.path.join(out_dir, "_checkpoint.json")
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "signature": signature,
+            "completed": sorted(completed),
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }, f)
+
+    os.replace(tmp_path, path)
+
+
+# =========================
+# WORKERS
+# =========================
+
+_app = None
+
+
+def init_worker(threads_per_worker):
+    """Runs once per worker process: loads the models a single time."""
+    global _app
+
+    import torch
+    from api import main as app_main
+
+    torch.set_num_threads(threads_per_worker)
+
+    for name in ("sentiment", "embedding", "risk_anchors"):
+        app_main.MODELS[name].get()
+
+    _app = app_main
+
+
+def score_rows(texts, language):
+    """
+    score_texts over the chunk; if the batch fails, rows are scored one at
+    a time and any that still fail get an error instead of aborting the run.
+    """
+    languages = [language] * len(texts) if language else None
+
+    try:
+        return _app.score_texts(texts, languages=languages)
+    except Exception:
+        logger.exception("Chunk failed, scoring rows one by one")
+
+    scored = []
+    for text in texts:
+        try:
+            scored.extend(_app.score_texts([text], languages=[language] if language else None))
+        except Exception as exc:
+            scored.append({"error": f"Analysis failed: {type(exc).__name__}: {exc}"})
+    return scored
+
+
+def score_chunk(task):
+    chunk_id, rows, ids, texts, language, out_dir = task
+
+    scored = score_rows(texts, language)
+
+    records = []
+    for row, row_id, text, result in zip(rows, ids, texts, scored):
+        records.append({
+            "row": row,
+            "id": None if row_id is None else str(row_id),
+            "text": text if isinstance(text, str) else None,
+            "language": result.get("language"),
+            "translated": result.get("translated"),
+            "sentiment": result.get("sentiment"),
+            "confidence": result.get("confidence"),
+            "severity": result.get("severity"),
+            "severity_reason": result.get("severity_reason"),
+            "error": result.get("error")
+        })
+
+    frame = pd.DataFrame.from_records(records, columns=OUTPUT_COLUMNS)
+
+    path = part_path(out_dir, chunk_id)
+    tmp_path = path + ".tmp"
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    return chunk_id, len(records)
+
+
+def tasks(args, completed):
+    text_column = None
+    row = 0
+
+    for chunk_id, frame in enumerate(read_chunks(args.input, args.chunk_size)):
+        text_column = text_column or pick_text_column(frame.columns, args.text_column)
+        rows = list(range(row, row + len(frame)))
+        row += len(frame)
+
+        if chunk_id in completed:
+            continue
+
+        texts = [t if isinstance(t, str) else None for t in frame[text_column].tolist()]
+        ids = frame[args.id_column].tolist() if args.id_column else [None] * len(frame)
+
+        yield chunk_id, rows, ids, texts, args.language, args.out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a file through the /analyze pipeline")
+    parser.add_argument("input", help=".tsv, .csv or .jsonl file")
+    parser.add_argument("--out", required=True, help="output directory of Parquet part files")
+    parser.add_argument("--text-column", default=None)
+    parser.add_argument("--id-column", default=None)
+    parser.add_argument("--language", default=None, help="skip detection and treat every row as this language")
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+
+    signature = run_signature(args)
+    completed = load_checkpoint(args.out, signature)
+    rows_done = 0
+
+    if completed:
+        print(f"Resuming: {len(completed)} chunks already scored")
+
+    threads_per_worker, _ = thread_budget(args.workers)
+    start = time.time()
+
+    def finish(result):
+        nonlocal rows_done
+        try:
+            chunk_id, count = result.get()
+        except Exception:
+            # Not checkpointed, so a rerun retries the chunk
+            logger.exception("Chunk failed")
+            return
+
+        completed.add(chunk_id)
+        rows_done += count
+        save_checkpoint(args.out, signature, completed)
+
+        elapsed = time.time() - start
+        print(f"chunk {chunk_id} done, {rows_done} rows in {elapsed:.1f}s ({rows_done / elapsed:.1f} rows/s)")
+
+    # spawn: every worker gets a clean interpreter and loads its own models
+    with get_context("spawn").Pool(
+        args.workers,
+        initializer=init_worker,
+        initargs=(threads_per_worker,)
+    ) as pool:
+        # Only a few chunks in flight, so the input is never read far ahead
+        pending = deque()
+
+        for task in tasks(args, completed):
+            pending.append(pool.apply_async(score_chunk, (task,)))
+            if len(pending) >= 2 * args.workers:
+                finish(pending.popleft())
+
+        while pending:
+            finish(pending.popleft())
+
+    print(f"Finished: {len(completed)} chunks in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import copy
+from bisect import bisect_right
+
+# Letter ranges per ISO 15924 script, matching the script suffix of NLLB
+# codes ("hin_Deva" -> "Deva"). Digits, punctuation and the dandas shared
+# by several Indic scripts are deliberately left out.
+SCRIPT_RANGES = {
+    "Latn": [(0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x024F)],
+    "Deva": [(0x0900, 0x0963), (0x0966, 0x097F), (0xA8E0, 0xA8FF)],
+    "Beng": [(0x0980, 0x09FF)],
+    "Guru": [(0x0A00, 0x0A7F)],
+    "Gujr": [(0x0A80, 0x0AFF)],
+    "Orya": [(0x0B00, 0x0B7F)],
+    "Taml": [(0x0B80, 0x0BFF)],
+    "Telu": [(0x0C00, 0x0C7F)],
+    "Knda": [(0x0C80, 0x0CFF)],
+}
+
+# Scripts written by many languages outside any lang_map, where the script
+# alone does not identify even a single supported candidate
+OPEN_SCRIPTS = {"Latn"}
+
+_BOUNDS = sorted(
+    (start, end, script)
+    for script, ranges in SCRIPT_RANGES.items()
+    for start, end in ranges
+)
+_STARTS = [start for start, _, _ in _BOUNDS]
+
+
+def script_of(char):
+    index = bisect_right(_STARTS, ord(char)) - 1
+    if index >= 0:
+        start, end, script = _BOUNDS[index]
+        if ord(char) <= end:
+            return script
+    return None
+
+
+def script_counts(text, limit=2000):
+    """Letters per script over the first `limit` characters."""
+    counts = {}
+    for char in text[:limit]:
+        if char.isascii() and not char.isalpha():
+            continue
+        script = script_of(char)
+        if script:
+            counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+class ScriptLanguageDetector:
+    """
+    Language detection restricted to `lang_map` (code -> NLLB code).
+
+    The dominant Unicode script decides the language when only one
+    supported language is written in it (Tamil, Gujarati, ...). When
+    several share it (Hindi / Marathi, Bengali / Assamese) langid
+    picks among just those. Text with no letters in a supported script
+    falls back to `default` with zero confidence.
+
+    The confidence is the dominant script's share of the letters times
+    langid's probability for the returned language. For scripts only
+    one supported language uses and few others do, langid is not run
+    and the share alone is returned. Latin text (OPEN_SCRIPTS) is still
+    answered with its single candidate, but its probability comes from
+    the unrestricted langid model, so French or Spanish come back as
+    ("en", low) rather than ("en", 1.0).
+    """
+
+    def __init__(self, lang_map, default="en"):
+        from langid.langid import LanguageIdentifier, model
+
+        self.default = default
+        self.candidates = {}
+        for code, nllb_code in lang_map.items():
+            self.candidates.setdefault(nllb_code.split("_")[-1], []).append(code)
+
+        base = LanguageIdentifier.from_modelstring(model, norm_probs=True)
+        self.unrestricted = base
+
+        # One restricted identifier per ambiguous script; copies share the
+        # full model arrays and only hold their own trimmed slices
+        self.identifiers = {}
+        for script, langs in self.candidates.items():
+            if len(langs) > 1:
+                identifier = copy.copy(base)
+                identifier.set_languages(langs)
+                self.identifiers[script] = identifier
+
+    def detect(self, text: str):
+        """Returns (language, confidence in [0, 1])."""
+        counts = script_counts(text)
+        counts = {s: n for s, n in counts.items() if s in self.candidates}
+
+        if not counts:
+            return self.default, 0.0
+
+        script = max(counts, key=counts.get)
+        share = counts[script] / sum(counts.values())
+
+        identifier = self.identifiers.get(script)
+        if identifier is None:
+            lang = self.candidates[script][0]
+            if script not in OPEN_SCRIPTS:
+                return lang, round(share, 3)
+            probability = dict(self.unrestricted.rank(text)).get(lang, 0.0)
+            return lang, round(share * probability, 3)
+
+        lang, probability = identifier.classify(text)
+        return lang, round(share * probability, 3)
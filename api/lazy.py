@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LazyResource:
+    """
+    Loads an expensive object (model, table, embeddings) on first use.
+
+    `get()` is thread-safe: concurrent callers wait for a single load.
+    A failed load is recorded and retried on the next `get()`.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+
+        self._value = None
+        self._loaded = False
+        self._loading = False
+        self._error = None
+        self._load_seconds = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._loaded:
+            return self._value
+
+        with self._lock:
+            if not self._loaded:
+                self._loading = True
+                start = time.time()
+                try:
+                    self._value = self.loader()
+                    self._error = None
+                    self._loaded = True
+                except Exception as exc:
+                    self._error = repr(exc)
+                    raise
+                finally:
+                    self._loading = False
+                    self._load_seconds = round(time.time() - start, 2)
+                logger.info("Loaded %s", self.name, extra={"resource": self.name, "seconds": self._load_seconds})
+
+        return self._value
+
+    @property
+    def ready(self):
+        return self._loaded
+
+    def status(self):
+        if self._loaded:
+            state = "ready"
+        elif self._loading:
+            state = "loading"
+        elif self._error:
+            state = "error"
+        else:
+            state = "not_loaded"
+
+        return {
+            "state": state,
+            "load_seconds": self._load_seconds,
+            "error": self._error
+        }
@@ -0,0 +1,243 @@
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    String-to-string LRU cache bounded by entry count and approximate
+    memory use, with optional SQLite write-through persistence.
+
+    When `persist_path` is set, in-memory misses fall back to the
+    SQLite store, so a restarted process starts warm. Writes are
+    buffered and committed every `flush_every` puts (or `flush_interval`
+    seconds) outside the cache lock. The store is bounded too: entries
+    older than `max_age` are dropped and least recently used ones are
+    evicted past `disk_max_bytes`, checked on every flush. A store
+    written under a different `version` is cleared on open.
+    """
+
+    def __init__(
+        self,
+        max_entries=4096,
+        max_bytes=32 * 1024 * 1024,
+        persist_path=None,
+        version=None,
+        disk_max_bytes=64 * 1024 * 1024,
+        max_age=7 * 86400,
+        flush_every=32,
+        flush_interval=1.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        self.disk_max_bytes = disk_max_bytes
+        self.max_age = max_age
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Writes not yet in SQLite, key -> (value, created_at, accessed_at)
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self.persist_path = persist_path
+        self._db = None
+        if persist_path:
+            self._connect()
+            self.evict()
+
+            atexit.register(self.flush)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.persist_path, check_same_thread=False, timeout=10)
+
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(entries)")]
+        if columns and "created_at" not in columns:
+            # Stores from before the size / age limits
+            self._db.execute("DROP TABLE entries")
+
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT, size INTEGER, created_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+        if self.version is not None:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self._db.execute("DELETE FROM entries")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (self.version,)
+                )
+
+        self._db.commit()
+
+    def _after_fork(self):
+        # SQLite connections must not be shared across fork(); the child
+        # opens its own and keeps the inherited in-memory entries. The
+        # parent still flushes the writes it had buffered.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending = {}
+        self._connect()
+
+    @staticmethod
+    def _size(key, value):
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self._db is None:
+                self.misses += 1
+                return None
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.hits += 1
+                self._insert(key, pending[0])
+                return pending[0]
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+        now = time.time()
+        with self._lock:
+            if row is not None and now - row[1] <= self.max_age:
+                self.disk_hits += 1
+                self._insert(key, row[0])
+                # Refreshes accessed_at with the next flush
+                self._pending.setdefault(key, (row[0], row[1], now))
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._insert(key, value)
+
+            if self._db is None:
+                return
+
+            now = time.time()
+            self._pending[key] = (value, now, now)
+            due = (
+                len(self._pending) >= self.flush_every or
+                time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Commits buffered writes in one transaction, then evicts."""
+        if self._db is None:
+            return
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return
+
+        rows = [
+            (key, value, len(key) + len(value), created, accessed)
+            for key, (value, created, accessed) in pending.items()
+        ]
+
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until under disk_max_bytes."""
+        with self._db_lock:
+            removed = self._db.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+            if total > self.disk_max_bytes:
+                # Trim to 90% so eviction does not run on every flush at the cap
+                target = total - int(self.disk_max_bytes * 0.9)
+                freed = 0
+                doomed = []
+                for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= target:
+                        break
+                self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                removed += len(doomed)
+
+            self._db.commit()
+
+        with self._lock:
+            self.evicted += removed
+
+    def _insert(self, key, value):
+        size = self._size(key, value)
+
+        if size > self.max_bytes:
+            return
+
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= self._size(key, old)
+
+        self._data[key] = value
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, old_value = self._data.popitem(last=False)
+            self._bytes -= self._size(old_key, old_value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk_evicted": self.evicted,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
@@ -1,18 +1,38 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List
-import langid
 import torch
 import os
 import requests
 import time 
 import re
+import unicodedata
+import json
+import hashlib
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 import torch.quantization
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 
+from api.anchor_index import AnchorIndex, load_anchor_bank
+from api.batching import MicroBatcher
+from api.language import ScriptLanguageDetector
+from api.lazy import LazyResource
+from api.log import configure_logging
+from api.lru_cache import LRUCache
+from api.metrics import CONTENT_TYPE, Registry
+from api.result_cache import ResultCache
+from api.threads import configure_torch_threads, thread_budget
+from api.ttl_cache import TTLCache
+
 
 # =========================
 # ENV
@@ -20,16 +40,32 @@ from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 
 load_dotenv()
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 HF_TOKEN = os.getenv("HF_TOKEN")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-print("YouTube key loaded:", bool(YOUTUBE_API_KEY))
+logger.info("YouTube key loaded", extra={"youtube_key": bool(YOUTUBE_API_KEY)})
+
+YOUTUBE_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3")
+YOUTUBE_TIMEOUT = float(os.getenv("YOUTUBE_TIMEOUT", "10"))
+YOUTUBE_CACHE_TTL = float(os.getenv("YOUTUBE_CACHE_TTL", "3600"))
+YOUTUBE_CACHE_STALE_TTL = float(os.getenv("YOUTUBE_CACHE_STALE_TTL", "86400"))
+YOUTUBE_CACHE_MAX_ENTRIES = int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", "64"))
+YOUTUBE_CACHE_PATH = os.getenv("YOUTUBE_CACHE_PATH") or None
 
 # =========================
 # APP
 # =========================
 
-app = FastAPI(title="Sentiment Insight Analyzer API")
+@asynccontextmanager
+async def lifespan(app):
+    start_warmup()
+    yield
+
+
+app = FastAPI(title="Sentiment Insight Analyzer API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +75,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# =========================
+# METRICS
+# =========================
+
+# Served in the Prometheus text format at GET /metrics
+metrics_registry = Registry()
+
+REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ["endpoint"]
+)
+REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled, by endpoint",
+    ["endpoint"]
+)
+STAGE_SECONDS = metrics_registry.histogram(
+    "pipeline_stage_duration_seconds",
+    "Latency of each pipeline stage; mode is single, batch or long",
+    ["stage", "mode"]
+)
+ANALYSES = metrics_registry.counter(
+    "analyses_total",
+    "Analyzed texts by language and severity",
+    ["language", "severity"]
+)
+TRANSLATION_INPUTS = metrics_registry.counter(
+    "translation_inputs_total",
+    "Texts reaching the translate step: skipped (already English), cached or translated",
+    ["outcome"]
+)
+YOUTUBE_ERRORS = metrics_registry.counter(
+    "youtube_errors_total",
+    "Failed YouTube API calls by endpoint and HTTP status / exception",
+    ["endpoint", "reason"]
+)
+
+
+def endpoint_label(path: str) -> str:
+    # Unknown paths share one label so scanners cannot blow up cardinality
+    if any(getattr(route, "path", None) == path for route in app.routes):
+        return path
+    return "other"
+
+
+def language_label(lang: str) -> str:
+    # Client-supplied languages outside LANG_MAP share one label
+    return lang if lang in LANG_MAP else "other"
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    endpoint = endpoint_label(request.url.path)
+    start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+
+    def finish():
+        REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish()
+        raise
+
+    # Streamed bodies (/analyze-stream) are still being produced when
+    # call_next returns, so the request ends when the body is exhausted
+    body = response.body_iterator
+
+    async def measured_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish()
+
+    response.body_iterator = measured_body()
+    return response
+
 # =========================
 # DEVICE
 # =========================
@@ -50,32 +167,181 @@ MODEL_DEVICE = "cuda" if DEVICE == 0 else "cpu"
 # MODELS
 # =========================
 
-sentiment_classifier = pipeline(
-    "text-classification",
-    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-    device=DEVICE
-)
+# Loaded on first use, or in the background warmup for PRELOAD_MODELS
+
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 
 # Semantic similarity model (for crisis detection)
-embedding_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+# Full hub id: SentenceTransformer adds the "sentence-transformers/" prefix
+# to bare names but transformers (used by the ONNX export) does not
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
 TRANSLATION_MODEL = "facebook/nllb-200-distilled-600M"
 
-translator_tokenizer = AutoTokenizer.from_pretrained(TRANSLATION_MODEL)
-translator_model = AutoModelForSeq2SeqLM.from_pretrained(
-    TRANSLATION_MODEL
-).to(MODEL_DEVICE)
 
-translator_model.eval()
+# "torch", "onnx" or "onnx-int8" (export first: python -m api.onnx_backend export)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+ONNX_DIR = os.getenv("ONNX_DIR", "models/onnx")
 
+# PyTorch models to run with int8 dynamic quantization
+# (check agreement first: python -m api.quantization)
+QUANTIZE_MODELS = [
+    m.strip()
+    for m in os.getenv("QUANTIZE_MODELS", "translator").split(",")
+    if m.strip()
+]
 
-translator_model = torch.quantization.quantize_dynamic(
-    translator_model,
-    {torch.nn.Linear},
-    dtype=torch.qint8
-)
 
-torch.set_num_threads(8)
+def quantize_module(module, inplace=False):
+    return torch.quantization.quantize_dynamic(
+        module,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=inplace
+    )
+
+
+def load_sentiment_classifier(backend=None, quantize=None):
+    backend = backend or INFERENCE_BACKEND
+
+    if backend.startswith("onnx"):
+        from api.onnx_backend import OnnxSentimentClassifier
+        return OnnxSentimentClassifier(
+            SENTIMENT_MODEL,
+            ONNX_DIR,
+            quantized=backend == "onnx-int8"
+        )
+
+    classifier = pipeline(
+        "text-classification",
+        model=SENTIMENT_MODEL,
+        device=DEVICE
+    )
+
+    if quantize is None:
+        quantize = "sentiment" in QUANTIZE_MODELS
+
+    if quantize:
+        classifier.model = quantize_module(classifier.model.eval())
+
+    return classifier
+
+
+def load_embedding_model(backend=None, quantize=None):
+    backend = backend or INFERENCE_BACKEND
+
+    if backend.startswith("onnx"):
+        from api.onnx_backend import OnnxSentenceEncoder
+        return OnnxSentenceEncoder(
+            EMBEDDING_MODEL,
+            ONNX_DIR,
+            quantized=backend == "onnx-int8"
+        )
+
+    encoder = SentenceTransformer(EMBEDDING_MODEL)
+
+    if quantize is None:
+        quantize = "embedding" in QUANTIZE_MODELS
+
+    if quantize:
+        # In place: sentence-transformers exposes auto_model as a read-only
+        # property, so the quantized module cannot be assigned back
+        quantize_module(encoder.eval(), inplace=True)
+
+    return encoder
+
+
+def load_translator(quantize=None):
+    tokenizer = AutoTokenizer.from_pretrained(TRANSLATION_MODEL)
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        TRANSLATION_MODEL
+    ).to(MODEL_DEVICE)
+
+    model.eval()
+
+    if quantize is None:
+        quantize = "translator" in QUANTIZE_MODELS
+
+    if quantize:
+        model = quantize_module(model)
+
+    return tokenizer, model
+
+
+sentiment_model = LazyResource("sentiment", load_sentiment_classifier)
+embedding_model = LazyResource("embedding", load_embedding_model)
+translator = LazyResource("translator", load_translator)
+
+
+def sentiment_classifier(texts, **kwargs):
+    return sentiment_model.get()(texts, **kwargs)
+
+# Torch threads per process: an even share of the cores across
+# WEB_CONCURRENCY server processes unless set explicitly. A
+# TORCH_INTEROP_THREADS of 0 leaves the inter-op pool to be set later
+# (python -m api.serve does this per forked worker).
+SERVE_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+TORCH_THREADS, TORCH_INTEROP_THREADS = thread_budget(SERVE_WORKERS)
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", TORCH_THREADS))
+TORCH_INTEROP_THREADS = int(os.getenv("TORCH_INTEROP_THREADS", TORCH_INTEROP_THREADS))
+
+configure_torch_threads(TORCH_THREADS, TORCH_INTEROP_THREADS)
+
+# Max items per forward pass in /analyze-batch
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "32"))
+
+# Micro-batching of concurrent /analyze calls
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "1") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "16"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "10"))
+
+# Bounded executors for the async /analyze pipeline
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", "4"))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+
+# Models loaded by the background warmup at startup; the rest load on first use.
+# English-only instances can leave out "translator".
+PRELOAD_MODELS = [
+    m.strip()
+    for m in os.getenv(
+        "PRELOAD_MODELS", "language,sentiment,embedding,risk_anchors,translator,roadmap_table"
+    ).split(",")
+    if m.strip()
+]
+
+# Inbound translation cache
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH") or None
+TRANSLATION_CACHE_DISK_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_DISK_MAX_BYTES", str(64 * 1024 * 1024)))
+TRANSLATION_CACHE_MAX_AGE = float(os.getenv("TRANSLATION_CACHE_MAX_AGE", str(7 * 86400)))
+
+# Risk-anchor bank and its precomputed embedding index
+RISK_ANCHORS_PATH = os.getenv("RISK_ANCHORS_PATH", "data/risk_anchors.csv")
+RISK_ANCHOR_INDEX_PATH = os.getenv("RISK_ANCHOR_INDEX_PATH", "models/risk_anchor_index")
+RISK_ANCHOR_DTYPE = os.getenv("RISK_ANCHOR_DTYPE", "float16")
+RISK_ANCHOR_TOP_K = int(os.getenv("RISK_ANCHOR_TOP_K", "5"))
+
+# Cheap TF-IDF + LogisticRegression first stage (notebooks/02_modeling.py)
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "0") == "1"
+CASCADE_MODEL_PATH = os.getenv("CASCADE_MODEL_PATH", "models/sentiment_pipeline.joblib")
+CASCADE_CONFIDENCE = float(os.getenv("CASCADE_CONFIDENCE", "0.85"))
+
+# Long-document mode: inputs longer than this many characters are split into
+# segments that are translated and classified in one batch each
+LONG_TEXT_CHARS = int(os.getenv("LONG_TEXT_CHARS", "400"))
+SEGMENT_MAX_CHARS = int(os.getenv("SEGMENT_MAX_CHARS", "300"))
+
+# Upper bound for generated translation length (scaled to input length below it)
+TRANSLATION_MAX_NEW_TOKENS = int(os.getenv("TRANSLATION_MAX_NEW_TOKENS", "400"))
+
+# Precomputed roadmap translations (rebuilt when roadmap text or model changes)
+ROADMAP_TABLE_PATH = os.getenv("ROADMAP_TABLE_PATH", "models/roadmap_translations.json")
+
+# Optional on-disk cache of full analysis results; unset disables it
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH") or None
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_CACHE_MAX_AGE = float(os.getenv("RESULT_CACHE_MAX_AGE", str(7 * 86400)))
 
 # =========================
 # CONSTANTS
@@ -88,29 +354,45 @@ LABELS = [
 ]
 
 
-RISK_ANCHORS = [
-"I want to die",
-"I feel suicidal",
-"I want to end my life",
-"I don't want to live anymore",
-"My life has no meaning",
-"There is no point in living",
-"I feel worthless",
-"Everyone would be better off without me",
-"The world would be better without me",
-"I shouldn't exist",
-"I want to disappear",
-"I wish I wasn't here",
-"I can't keep going",
-"I just want everything to stop",
-"Nothing will ever get better",
-"I don't see a future for myself"
-]
+RISK_SIMILARITY_THRESHOLD = 0.68
 
-risk_anchor_embeddings = embedding_model.encode(
-    RISK_ANCHORS,
-    convert_to_tensor=True
-)
+# Per-category overrides; anything not listed uses RISK_SIMILARITY_THRESHOLD
+RISK_CATEGORY_THRESHOLDS = {}
+
+RISK_ANCHOR_BANK = load_anchor_bank(RISK_ANCHORS_PATH)
+
+RISK_ANCHORS = [anchor["text"] for anchor in RISK_ANCHOR_BANK]
+
+
+def load_risk_anchor_index():
+    """
+    Loads the anchor index from disk, re-encoding the bank when it is
+    missing or was built from other anchors, model or dtype.
+    """
+    version = AnchorIndex.version(RISK_ANCHOR_BANK, EMBEDDING_MODEL, RISK_ANCHOR_DTYPE)
+
+    if AnchorIndex.stored_version(RISK_ANCHOR_INDEX_PATH) != version:
+        logger.info("Building risk anchor index", extra={"path": RISK_ANCHOR_INDEX_PATH})
+        AnchorIndex.build(
+            RISK_ANCHOR_BANK,
+            lambda texts: embedding_model.get().encode(
+                texts,
+                batch_size=BATCH_SIZE,
+                convert_to_numpy=True
+            ),
+            EMBEDDING_MODEL,
+            RISK_ANCHOR_INDEX_PATH,
+            dtype=RISK_ANCHOR_DTYPE
+        )
+
+    return AnchorIndex.load(
+        RISK_ANCHOR_INDEX_PATH,
+        thresholds=RISK_CATEGORY_THRESHOLDS,
+        default_threshold=RISK_SIMILARITY_THRESHOLD
+    )
+
+
+risk_anchor_index = LazyResource("risk_anchors", load_risk_anchor_index)
 
 
 LANG_MAP = {
@@ -134,6 +416,8 @@ LANG_MAP = {
 class TextRequest(BaseModel):
     text: str
     language: str | None = None
+    # "auto" switches to long-document mode past LONG_TEXT_CHARS; "long" / "short" force it
+    mode: str | None = "auto"
 
 class BatchRequest(BaseModel):
     texts: List[str]
@@ -142,24 +426,88 @@ class BatchRequest(BaseModel):
 # HELPERS
 # =========================
 
+# Script ranges first, langid only among LANG_MAP languages sharing a script
+language_detector = LazyResource("language", lambda: ScriptLanguageDetector(LANG_MAP))
+
+
+def detect_language_with_confidence(text: str):
+    return language_detector.get().detect(text)
+
+
 def detect_language(text: str) -> str:
-    code, _ = langid.classify(text)
-    return code if code in LANG_MAP else "en"
+    return detect_language_with_confidence(text)[0]
+
+
+# Bump when translation generation changes in code (e.g. the length cap)
+TRANSLATION_CACHE_SCHEMA = 2
+
+
+def translation_cache_version():
+    payload = json.dumps({
+        "schema": TRANSLATION_CACHE_SCHEMA,
+        "model": TRANSLATION_MODEL,
+        "quantized": "translator" in QUANTIZE_MODELS,
+        "max_new_tokens": TRANSLATION_MAX_NEW_TOKENS
+    })
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+translation_cache = LRUCache(
+    max_entries=TRANSLATION_CACHE_SIZE,
+    max_bytes=TRANSLATION_CACHE_MAX_BYTES,
+    persist_path=TRANSLATION_CACHE_PATH,
+    version=translation_cache_version(),
+    disk_max_bytes=TRANSLATION_CACHE_DISK_MAX_BYTES,
+    max_age=TRANSLATION_CACHE_MAX_AGE
+)
+
+
+def translation_key(text: str, src: str, tgt: str) -> str:
+    # Case is kept: the sentiment model is cased
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return f"{src}|{tgt}|{normalized}"
+
+
+def max_new_tokens_for(inputs) -> int:
+    # Never below the old fixed cap of 40; grows with the longest input so
+    # longer texts are no longer cut off mid-sentence
+    scaled = int(inputs["input_ids"].shape[1] * 1.5) + 10
+    return min(max(40, scaled), TRANSLATION_MAX_NEW_TOKENS)
+
 
 def translate(text: str, src: str, tgt: str) -> str:
     if src == tgt:
         return text
 
+    key = translation_key(text, src, tgt)
+    cached = translation_cache.get(key)
+
+    if cached is not None:
+        TRANSLATION_INPUTS.inc(outcome="cached")
+        return cached
+
+    translated = translate_uncached(text, src, tgt)
+    translation_cache.put(key, translated)
+    TRANSLATION_INPUTS.inc(outcome="translated")
+
+    return translated
+
+
+def translate_uncached(text: str, src: str, tgt: str) -> str:
+
     # Safety guard
     if src not in LANG_MAP:
         src = "en"
 
+    translator_tokenizer, translator_model = translator.get()
+
     translator_tokenizer.src_lang = LANG_MAP[src]
 
     inputs = translator_tokenizer(
         text,
         return_tensors="pt",
-        padding=True
+        padding=True,
+        truncation=True
     ).to(MODEL_DEVICE)
 
     forced_bos_token_id = translator_tokenizer.convert_tokens_to_ids(
@@ -170,7 +518,7 @@ def translate(text: str, src: str, tgt: str) -> str:
         tokens = translator_model.generate(
             **inputs,
             forced_bos_token_id=forced_bos_token_id,
-            max_new_tokens=40,
+            max_new_tokens=max_new_tokens_for(inputs),
             num_beams=1,
             do_sample=False
         )
@@ -248,51 +596,118 @@ DESPAIR_PATTERNS = [
     "i feel hopeless",
     "there is no way out"
 ]
-def split_clauses(text):
-    return re.split(r"[.,;!?]", text)
+CLAUSE_SEPARATORS = r"[.,;!?]"
 
-def severity_from_result(result: dict, text_en: str) -> str:
 
-    clauses = split_clauses(text_en)
+class RiskPhraseMatcher:
+    """
+    Compiles RISK_PATTERNS and DESPAIR_PATTERNS once into a single
+    alternation and reports every hit in one pass over the text.
 
-    for clause in clauses:
-        clause_lower = clause.lower()
+    Each alternative sits inside a lookahead, so overlapping phrases
+    ("life has no meaning" / "no meaning") are all found. Hits record
+    whether they cross a clause boundary so the clause-level rules of
+    the original per-pattern loop are preserved.
+    """
 
-        for pattern in RISK_PATTERNS:
-            if re.search(pattern, clause_lower):
-                return "High"
+    def __init__(self, risk_patterns, despair_phrases):
+        self.entries = (
+            [("risk", p) for p in risk_patterns] +
+            [("despair", re.escape(p)) for p in despair_phrases]
+        )
+        self.phrases = list(risk_patterns) + list(despair_phrases)
 
-        for phrase in DESPAIR_PATTERNS:
-            if phrase in clause_lower:
-                return "High"
+        alternation = "|".join(
+            f"(?P<p{i}>{pattern})"
+            for i, (_, pattern) in enumerate(self.entries)
+        )
+        self.regex = re.compile(f"(?=(?:{alternation}))")
+        self.separator = re.compile(CLAUSE_SEPARATORS)
 
-    sentiment = result["labels"][0]
-    score = result["scores"][0]
+    def find_all(self, text: str):
+        text_lower = text.lower()
+        hits = []
+
+        for match in self.regex.finditer(text_lower):
+            name = match.lastgroup
+            index = int(name[1:])
+            start, end = match.span(name)
+
+            hits.append({
+                "kind": self.entries[index][0],
+                "pattern": self.phrases[index],
+                "span": (start, end),
+                "in_clause": self.separator.search(text_lower, start, end) is None
+            })
+
+        return hits
 
-    text_lower = text_en.lower()
+    def trigger(self, text: str, sentiment: str):
+        """
+        Returns the first hit that forces High severity, or None.
+        Mirrors the original rule order: any clause-level hit wins,
+        then explicit risk anywhere, then despair + negative mood.
+        """
+        hits = self.find_all(text)
 
-    # 1️⃣ Explicit suicide detection
-    for pattern in RISK_PATTERNS:
-        if re.search(pattern, text_lower):
-            return "High"
+        for hit in hits:
+            if hit["in_clause"]:
+                return hit
 
-    # 2️⃣ Despair + negative mood
-    for phrase in DESPAIR_PATTERNS:
-        if phrase in text_lower and sentiment == "negative":
-            return "High"
+        for hit in hits:
+            if hit["kind"] == "risk":
+                return hit
 
-    # 3️⃣ Semantic similarity
-    text_embedding = embedding_model.encode(text_en, convert_to_tensor=True)
-    similarities = util.cos_sim(text_embedding, risk_anchor_embeddings)[0]
+        if sentiment == "negative":
+            for hit in hits:
+                if hit["kind"] == "despair":
+                    return hit
 
-    if similarities.max() > 0.68:
-        return "High"
+        return None
 
-    # 4️⃣ Negative mood
+
+risk_matcher = RiskPhraseMatcher(RISK_PATTERNS, DESPAIR_PATTERNS)
+
+
+def semantic_risk_matches(texts):
+    """
+    Anchor-index search result for each text (the triggering anchor,
+    if any, and the top-k anchors), found with one encode call and one
+    scoring pass against the anchor index.
+    """
+    if not texts:
+        return []
+
+    text_embeddings = embedding_model.get().encode(
+        texts,
+        batch_size=BATCH_SIZE,
+        convert_to_numpy=True
+    )
+
+    return risk_anchor_index.get().search(text_embeddings, k=RISK_ANCHOR_TOP_K)
+
+
+def semantic_trigger(matches):
+    return matches["trigger"] if matches else None
+
+
+def severity_from_signals(sentiment: str, hit, matches):
+
+    # 1️⃣ Explicit suicide / despair phrases
+    if hit:
+        return "High", f"{hit['kind']}:{hit['pattern']}"
+
+    # 2️⃣ Semantic similarity
+    anchor = semantic_trigger(matches)
+    if anchor:
+        return "High", f"semantic:{anchor['category']}"
+
+    # 3️⃣ Negative mood
     if sentiment == "negative":
-        return "Mild"
+        return "Mild", "sentiment"
+
+    return "Low", "sentiment"
 
-    return "Low"
 
 # =========================
 # ROADMAP
@@ -329,14 +744,47 @@ def generate_roadmap(severity: str):
 # YOUTUBE
 # =========================
 
-def youtube_search(query: str, max_results=8):
+# Shared keep-alive session for all YouTube API calls
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
+class YouTubeAPIError(Exception):
+    pass
+
+
+def youtube_get(endpoint: str, params: dict) -> dict:
+    """
+    GET one YouTube Data API endpoint. API and network errors are
+    counted, logged and raised, so youtube_cache never stores a failed
+    lookup as an empty result.
+    """
+    try:
+        response = http_session.get(
+            f"{YOUTUBE_API_BASE}/{endpoint}", params=params, timeout=YOUTUBE_TIMEOUT
+        )
+    except requests.RequestException as exc:
+        YOUTUBE_ERRORS.inc(endpoint=endpoint, reason=type(exc).__name__)
+        # Not repr(exc): the request URL in it carries the API key
+        logger.warning("YouTube request failed", extra={"endpoint": endpoint, "error": type(exc).__name__})
+        raise
+
+    if response.status_code >= 400:
+        YOUTUBE_ERRORS.inc(endpoint=endpoint, reason=str(response.status_code))
+        logger.warning("YouTube API error", extra={"endpoint": endpoint, "status": response.status_code})
+        raise YouTubeAPIError(f"{endpoint} returned HTTP {response.status_code}")
+
+    return response.json()
+
+
+def fetch_youtube(query: str, max_results=8):
 
     if not YOUTUBE_API_KEY:
-        print("No YouTube API key")
+        YOUTUBE_ERRORS.inc(endpoint="search", reason="no_api_key")
+        logger.warning("No YouTube API key")
         return []
 
-    search_url = "https://www.googleapis.com/youtube/v3/search"
-
     search_params = {
         "part": "snippet",
         "q": query,
@@ -345,9 +793,7 @@ def youtube_search(query: str, max_results=8):
         "key": YOUTUBE_API_KEY
     }
 
-    search_res = requests.get(search_url, params=search_params).json()
-
-    print("YOUTUBE SEARCH RESPONSE:", search_res)
+    search_res = youtube_get("search", search_params)
 
     video_ids = [
         item["id"]["videoId"]
@@ -356,18 +802,16 @@ def youtube_search(query: str, max_results=8):
     ]
 
     if not video_ids:
-        print("No videos found")
+        logger.info("No videos found", extra={"query": query})
         return []
 
-    stats_url = "https://www.googleapis.com/youtube/v3/videos"
-
     stats_params = {
         "part": "snippet,statistics",
         "id": ",".join(video_ids),
         "key": YOUTUBE_API_KEY
     }
 
-    stats_res = requests.get(stats_url, params=stats_params).json()
+    stats_res = youtube_get("videos", stats_params)
 
     videos = []
 
@@ -383,16 +827,357 @@ def youtube_search(query: str, max_results=8):
 
     return videos
 
+
+youtube_cache = TTLCache(
+    fetch_youtube,
+    ttl=YOUTUBE_CACHE_TTL,
+    stale_ttl=YOUTUBE_CACHE_STALE_TTL,
+    max_entries=YOUTUBE_CACHE_MAX_ENTRIES,
+    persist_path=YOUTUBE_CACHE_PATH
+)
+
+
+def youtube_search(query: str, max_results=8):
+    with STAGE_SECONDS.time(stage="youtube", mode="single"):
+        return youtube_cache.get(f"{max_results}|{query}", query, max_results)
+
+# =========================
+# SENTIMENT CASCADE
+# =========================
+
+def load_cascade_model():
+    # scikit-learn / joblib are only needed when the cascade is enabled
+    import joblib
+    return joblib.load(CASCADE_MODEL_PATH)
+
+
+cascade_model = LazyResource("cascade", load_cascade_model)
+
+cascade_stats = {"texts": 0, "escalated": 0}
+cascade_lock = threading.Lock()
+
+
+def classify_texts(texts, batch_size=BATCH_SIZE):
+    """
+    Sentiment for a list of English texts. With CASCADE_ENABLED the
+    joblib model scores everything first and only predictions below
+    CASCADE_CONFIDENCE are escalated to the transformer.
+    """
+    # Inputs past the model's 512-token window are truncated rather than
+    # failing the whole batch; long-document mode splits them beforehand
+    if not CASCADE_ENABLED:
+        return sentiment_classifier(texts, batch_size=batch_size, truncation=True)
+
+    model = cascade_model.get()
+    probabilities = model.predict_proba(texts)
+    classes = list(model.classes_)
+
+    results = [None] * len(texts)
+    escalate = []
+
+    for i, row in enumerate(probabilities):
+        best = int(row.argmax())
+        if row[best] >= CASCADE_CONFIDENCE:
+            results[i] = {"label": classes[best], "score": float(row[best])}
+        else:
+            escalate.append(i)
+
+    if escalate:
+        escalated = sentiment_classifier(
+            [texts[i] for i in escalate],
+            batch_size=batch_size,
+            truncation=True
+        )
+        for i, raw in zip(escalate, escalated):
+            results[i] = raw
+
+    with cascade_lock:
+        cascade_stats["texts"] += len(texts)
+        cascade_stats["escalated"] += len(escalate)
+
+    return results
+
+# =========================
+# MICRO-BATCHING
+# =========================
+
+def classify_batch(texts):
+    return classify_texts(texts, batch_size=len(texts))
+
+
+sentiment_batcher = MicroBatcher(
+    classify_batch,
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    name="sentiment"
+)
+
+similarity_batcher = MicroBatcher(
+    semantic_risk_matches,
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    name="similarity"
+)
+
+
+# =========================
+# ASYNC PIPELINE
+# =========================
+
+model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="model")
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+
+
+async def run_model(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(model_executor, fn, *args)
+
+
+async def run_io(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, fn, *args)
+
+
+async def classify_sentiment_async(text: str) -> dict:
+    if MICROBATCH_ENABLED:
+        return await asyncio.wrap_future(sentiment_batcher.submit(text))
+    return (await run_model(classify_texts, [text]))[0]
+
+
+async def risk_similarity_async(text: str) -> list:
+    if MICROBATCH_ENABLED:
+        return await asyncio.wrap_future(similarity_batcher.submit(text))
+    return (await run_model(semantic_risk_matches, [text]))[0]
+
+
+async def severity_with_reason_async(result: dict, text_en: str):
+
+    sentiment = result["labels"][0]
+
+    # Off the event loop: short-mode input length is not bounded
+    with STAGE_SECONDS.time(stage="severity_regex", mode="single"):
+        hit = await run_model(risk_matcher.trigger, text_en, sentiment)
+
+    # Embedding is only needed when no phrase fired
+    if hit:
+        matches = None
+    else:
+        with STAGE_SECONDS.time(stage="severity_semantic", mode="single"):
+            matches = await risk_similarity_async(text_en)
+
+    return severity_from_signals(sentiment, hit, matches)
+
+# =========================
+# LONG DOCUMENTS
+# =========================
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:])\s+")
+
+SEVERITY_RANK = {"Low": 0, "Mild": 1, "High": 2}
+
+
+def split_words(text: str, max_chars):
+    """
+    Packs words into pieces of at most `max_chars`; a single word longer
+    than that is cut into slices.
+    """
+    pieces = []
+    current = ""
+
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+
+        if current and len(current) + len(word) + 1 > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+
+    if current:
+        pieces.append(current)
+
+    return pieces
+
+
+def split_segments(text: str, max_chars=SEGMENT_MAX_CHARS):
+    """
+    Sentences, with any sentence over `max_chars` further split at
+    clause punctuation, and any clause still over it at word boundaries,
+    so every segment fits the models' windows.
+    """
+    segments = []
+
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+
+        if len(sentence) <= max_chars:
+            segments.append(sentence)
+            continue
+
+        clauses = []
+        for clause in CLAUSE_BOUNDARY.split(sentence):
+            if len(clause) > max_chars:
+                clauses.extend(split_words(clause, max_chars))
+            else:
+                clauses.append(clause)
+
+        current = ""
+        for clause in clauses:
+            if current and len(current) + len(clause) + 1 > max_chars:
+                segments.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            segments.append(current)
+
+    return segments
+
+
+def is_long_text(req: TextRequest) -> bool:
+    if req.mode == "long":
+        return True
+    if req.mode == "short":
+        return False
+    return len(req.text) > LONG_TEXT_CHARS
+
+
+def analyze_long_document(text: str, lang: str):
+    """
+    Translates all segments in one padded batch per BATCH_SIZE, classifies
+    them in one batched pass and scores severity per segment.
+
+    Document sentiment is the length-weighted vote of segment labels;
+    document severity is the worst segment's.
+    """
+    segments = split_segments(text) or [text.strip()]
+
+    if lang == "en":
+        segments_en = segments
+        TRANSLATION_INPUTS.inc(len(segments), outcome="skipped")
+    else:
+        segments_en = []
+        for chunk in chunked(segments, BATCH_SIZE):
+            segments_en.extend(translate_batch(chunk, lang, "en"))
+        TRANSLATION_INPUTS.inc(len(segments), outcome="translated")
+
+    raw_results = classify_texts(segments_en)
+    sentiments = [r["label"].lower() for r in raw_results]
+
+    hits = [
+        risk_matcher.trigger(seg, sentiments[k])
+        for k, seg in enumerate(segments_en)
+    ]
+    needs_semantic = [k for k, hit in enumerate(hits) if hit is None]
+    similarity = dict(zip(
+        needs_semantic,
+        semantic_risk_matches([segments_en[k] for k in needs_semantic])
+    ))
+
+    breakdown = []
+    votes = {}
+    total_weight = 0
+
+    for k, seg in enumerate(segments):
+        severity, reason = severity_from_signals(sentiments[k], hits[k], similarity.get(k))
+        score = float(raw_results[k]["score"])
+        weight = len(seg)
+
+        votes[sentiments[k]] = votes.get(sentiments[k], 0.0) + score * weight
+        total_weight += weight
+
+        breakdown.append({
+            "text": seg,
+            "translated": segments_en[k],
+            "sentiment": sentiments[k],
+            "confidence": round(score, 3),
+            "severity": severity,
+            "severity_reason": reason
+        })
+
+    sentiment = max(votes, key=votes.get)
+    worst = max(breakdown, key=lambda b: SEVERITY_RANK[b["severity"]])
+
+    return {
+        "sentiment": sentiment,
+        "confidence": round(votes[sentiment] / total_weight, 3),
+        "severity": worst["severity"],
+        "severity_reason": worst["severity_reason"],
+        "segments": breakdown
+    }
+
+# =========================
+# RESULT CACHE
+# =========================
+
+# Bump when sentiment / severity logic changes in code in a way the
+# inputs below do not capture
+RESULT_CACHE_SCHEMA = 2
+
+
+def pipeline_version():
+    """
+    Hash of everything that decides an analysis result, so a change to
+    any model, pattern, anchor or threshold invalidates cached results.
+    """
+    cascade = None
+    if CASCADE_ENABLED:
+        mtime = os.path.getmtime(CASCADE_MODEL_PATH) if os.path.exists(CASCADE_MODEL_PATH) else None
+        cascade = [CASCADE_MODEL_PATH, mtime, CASCADE_CONFIDENCE]
+
+    payload = json.dumps({
+        "schema": RESULT_CACHE_SCHEMA,
+        "models": [SENTIMENT_MODEL, EMBEDDING_MODEL, TRANSLATION_MODEL],
+        "backend": INFERENCE_BACKEND,
+        "quantized": sorted(QUANTIZE_MODELS),
+        "cascade": cascade,
+        "risk_patterns": RISK_PATTERNS,
+        "despair_patterns": DESPAIR_PATTERNS,
+        "risk_anchors": RISK_ANCHOR_BANK,
+        "risk_threshold": RISK_SIMILARITY_THRESHOLD,
+        "category_thresholds": RISK_CATEGORY_THRESHOLDS,
+        "anchor_index": RISK_ANCHOR_DTYPE,
+        "languages": LANG_MAP,
+        "long_documents": [LONG_TEXT_CHARS, SEGMENT_MAX_CHARS, TRANSLATION_MAX_NEW_TOKENS]
+    }, sort_keys=True, ensure_ascii=False)
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+result_cache = ResultCache(
+    RESULT_CACHE_PATH,
+    pipeline_version(),
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+    max_age=RESULT_CACHE_MAX_AGE
+) if RESULT_CACHE_PATH else None
+
+
+def result_key(text: str, lang: str, mode: str) -> str:
+    # Same normalization as translation_key: NFC, collapsed whitespace, case kept
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return result_cache.key(mode, lang, normalized)
+
 # =========================
 # ENDPOINTS
 # =========================
-def translate_batch(texts, src, tgt):
+def translate_batch(texts, src, tgt, models=None):
     if src == tgt:
         return texts
 
     if src not in LANG_MAP:
         src = "en"
 
+    # models: optional (tokenizer, model) pair, e.g. for fp32 / int8 comparisons
+    translator_tokenizer, translator_model = models or translator.get()
+
     translator_tokenizer.src_lang = LANG_MAP[src]
 
     inputs = translator_tokenizer(
@@ -410,7 +1195,7 @@ def translate_batch(texts, src, tgt):
         tokens = translator_model.generate(
             **inputs,
             forced_bos_token_id=forced_bos_token_id,
-            max_new_tokens=40,
+            max_new_tokens=max_new_tokens_for(inputs),
             num_beams=1,
             do_sample=False
         )
@@ -419,6 +1204,122 @@ def translate_batch(texts, src, tgt):
         tokens,
         skip_special_tokens=True
     )
+# =========================
+# ROADMAP TRANSLATIONS
+# =========================
+
+SEVERITIES = ["High", "Mild", "Low"]
+
+
+def roadmap_source_texts():
+    return [
+        step["text"]
+        for sev in SEVERITIES
+        for step in generate_roadmap(sev)
+    ]
+
+
+def roadmap_table_version():
+    # Same generation settings as the translation cache (model,
+    # quantization, length cap), plus the roadmap text itself
+    payload = json.dumps(
+        {"translation": translation_cache_version(), "texts": roadmap_source_texts()},
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_roadmap_table():
+    texts = roadmap_source_texts()
+    translations = {}
+
+    for lang in LANG_MAP:
+        if lang == "en":
+            continue
+        translations[lang] = dict(zip(texts, translate_batch(texts, "en", lang)))
+
+    return {
+        "version": roadmap_table_version(),
+        "model": TRANSLATION_MODEL,
+        "translations": translations
+    }
+
+
+def read_roadmap_table(path=ROADMAP_TABLE_PATH):
+    """The stored table's translations, or None if missing or stale."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    if table.get("version") != roadmap_table_version():
+        return None
+    return table["translations"]
+
+
+def load_roadmap_table(path=ROADMAP_TABLE_PATH):
+    """
+    Loads the roadmap translation table from disk, rebuilding it with
+    the translator when it is missing or was made for other roadmap
+    text or translation settings.
+    """
+    translations = read_roadmap_table(path)
+    if translations is not None:
+        return translations
+
+    logger.info("Roadmap table missing or stale, building", extra={"path": path})
+
+    table = build_roadmap_table()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+    return table["translations"]
+
+
+roadmap_translations = LazyResource("roadmap_table", load_roadmap_table)
+
+
+def translate_roadmaps(severities, lang):
+    """
+    Roadmaps for each distinct severity in the target language.
+    Served from the precomputed table; anything missing from it
+    falls back to a single translate_batch call.
+    """
+    severities = list(dict.fromkeys(severities))
+    roadmaps_en = {sev: generate_roadmap(sev) for sev in severities}
+
+    texts = [step["text"] for sev in severities for step in roadmaps_en[sev]]
+
+    if lang == "en" or not texts:
+        translated = texts
+    else:
+        table = roadmap_translations.get().get(lang, {})
+        missing = [t for t in texts if t not in table]
+        fallback = dict(zip(missing, translate_batch(missing, "en", lang))) if missing else {}
+        translated = [table.get(t, fallback.get(t)) for t in texts]
+
+    roadmaps = {}
+    offset = 0
+
+    for sev in severities:
+        steps = roadmaps_en[sev]
+        roadmaps[sev] = [
+            {"text": translated[offset + i], "level": step["level"]}
+            for i, step in enumerate(steps)
+        ]
+        offset += len(steps)
+
+    return roadmaps
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 def yt_query_for_severity(severity: str):
     if severity == "High":
         return "grounding exercise emotional distress breathing"
@@ -427,26 +1328,73 @@ def yt_query_for_severity(severity: str):
     return "positive mindset productivity motivation"
 
 
-@app.post("/analyze")
-def analyze_text(req: TextRequest):
+# =========================
+# STARTUP / READINESS
+# =========================
 
-    start_time = time.time()
+MODELS = {
+    resource.name: resource
+    for resource in [
+        language_detector,
+        sentiment_model,
+        embedding_model,
+        risk_anchor_index,
+        translator,
+        roadmap_translations,
+        cascade_model
+    ]
+}
 
-    original = req.text
 
+# Preloads left to first use, which readiness does not wait for
+warmup_skipped = set()
 
 
-    if not is_meaningful_text(original):
-        return {
-            "error": "Input is too short or not meaningful for sentiment analysis."
-        }
+def skip_preload(name):
+    """
+    True for a roadmap table that would have to be built while the
+    translator is not preloaded: building it loads NLLB anyway, so it
+    is left to the first non-English request.
+    """
+    if name == "roadmap_table" and "translator" not in PRELOAD_MODELS and read_roadmap_table() is None:
+        logger.info("Skipping roadmap table build without translator preload")
+        warmup_skipped.add(name)
+        return True
+    return False
+
+
+def warmup():
+    for name in PRELOAD_MODELS:
+        if name not in MODELS:
+            logger.warning("Unknown model in PRELOAD_MODELS", extra={"model": name})
+            continue
+        if skip_preload(name):
+            continue
+        try:
+            MODELS[name].get()
+        except Exception:
+            logger.exception("Warmup failed", extra={"model": name})
 
-    lang = req.language if req.language and req.language != "auto" else detect_language(original)
 
+def start_warmup():
+    threading.Thread(target=warmup, name="warmup", daemon=True).start()
+
+
+async def analyze_short_text(original: str, lang: str) -> dict:
+    """
+    Translation, sentiment and severity for one short input; the
+    cacheable part of /analyze.
+    """
     # Skip translation if already English
-    text_en = original if lang == "en" else translate(original, lang, "en")
+    if lang == "en":
+        text_en = original
+        TRANSLATION_INPUTS.inc(outcome="skipped")
+    else:
+        with STAGE_SECONDS.time(stage="translate", mode="single"):
+            text_en = await run_model(translate, original, lang, "en")
 
-    raw = sentiment_classifier(text_en)[0]
+    with STAGE_SECONDS.time(stage="sentiment", mode="single"):
+        raw = await classify_sentiment_async(text_en)
 
     sentiment = raw["label"].lower()
     confidence = round(float(raw["score"]), 3)
@@ -456,55 +1404,465 @@ def analyze_text(req: TextRequest):
     "scores": [raw["score"]]
     }
 
-    sentiment = result["labels"][0]
-    severity = severity_from_result(result, text_en)
+    severity, severity_reason = await severity_with_reason_async(result, text_en)
 
-    print({
+    logger.debug("Analysis", extra={
         "language": lang,
         "translated": text_en,
         "scores": dict(zip(result["labels"], result["scores"])),
-        "severity": severity
+        "severity": severity,
+        "severity_reason": severity_reason
     })
 
-    roadmap_en = generate_roadmap(severity)
+    return {
+        "translated": text_en,
+        "sentiment": sentiment,
+        "confidence": confidence,
+        "severity": severity,
+        "severity_reason": severity_reason
+    }
+
 
-    roadmap_texts = [step["text"] for step in roadmap_en]
+async def analysis_events(req: TextRequest):
+    """
+    The /analyze pipeline as a sequence of (event, payload) pairs:
+    "analysis" (sentiment + severity), then "roadmap", then "youtube".
+    Invalid input yields a single "error" event.
+    """
+    start_time = time.time()
 
-    if lang == "en":
-     translated_steps = roadmap_texts
+    original = req.text
+
+    if not is_meaningful_text(original):
+        yield "error", {
+            "error": "Input is too short or not meaningful for sentiment analysis."
+        }
+        return
+
+    if req.language and req.language != "auto":
+        lang = req.language
+        language_confidence = None
     else:
-      translated_steps = translate_batch(roadmap_texts, "en", lang)
-    roadmap_out = [
-    {"text": translated_steps[i], "level": roadmap_en[i]["level"]}
-    for i in range(len(roadmap_en))
-]
-    try:
-     yt_results = youtube_search(
-        yt_query_for_severity(severity),
-        max_results=8
-    ) 
-    except:
-     yt_results = []
-     
-    
-    print("Request latency:", round(time.time() - start_time, 2), "seconds")
+        with STAGE_SECONDS.time(stage="detect_language", mode="single"):
+            lang, language_confidence = await run_model(detect_language_with_confidence, original)
 
-    return {
+    long_mode = is_long_text(req)
+
+    cache_key = result_key(original, lang, "long" if long_mode else "short") if result_cache else None
+    core = None
+
+    if cache_key:
+        with STAGE_SECONDS.time(stage="result_cache", mode="single"):
+            core = await run_io(result_cache.get, cache_key)
+
+    if core is None:
+        if long_mode:
+            with STAGE_SECONDS.time(stage="long_document", mode="long"):
+                core = await run_model(analyze_long_document, original, lang)
+        else:
+            core = await analyze_short_text(original, lang)
+
+        if cache_key:
+            await run_io(result_cache.put, cache_key, core)
+
+    severity = core["severity"]
+
+    analysis = {
         "text": original,
-        "sentiment": sentiment,
-        "confidence": confidence,
+        "sentiment": core["sentiment"],
+        "confidence": core["confidence"],
         "severity": severity,
-        "roadmap": roadmap_out,
-        "youtube_recommendations": yt_results,
-        "language": lang
+        "language": lang,
+        "language_confidence": language_confidence
     }
 
+    if long_mode:
+        analysis["segments"] = core["segments"]
+
+    ANALYSES.inc(language=language_label(lang), severity=severity)
+
+    # Start YouTube as soon as severity is known, overlapping the roadmap
+    yt_task = asyncio.ensure_future(
+        run_io(youtube_search, yt_query_for_severity(severity), 8)
+    )
+
+    try:
+        yield "analysis", analysis
+
+        with STAGE_SECONDS.time(stage="roadmap", mode="single"):
+            roadmap_out = (await run_model(translate_roadmaps, [severity], lang))[severity]
+
+        yield "roadmap", {"roadmap": roadmap_out}
+
+        try:
+            yt_results = await yt_task
+        except Exception:
+            yt_results = []
+
+        yield "youtube", {"youtube_recommendations": yt_results}
+    finally:
+        # Client went away mid-stream
+        if not yt_task.done():
+            yt_task.cancel()
+
+    logger.info("Analyze finished", extra={
+        "seconds": round(time.time() - start_time, 3),
+        "language": lang,
+        "severity": severity
+    })
+
+
+@app.post("/analyze")
+async def analyze_text(req: TextRequest):
+
+    response = {}
+
+    async for event, payload in analysis_events(req):
+        if event == "error":
+            return payload
+        response.update(payload)
+
+    return response
+
+
+@app.post("/analyze-stream")
+async def analyze_stream(req: TextRequest, request: Request):
+    """
+    Same pipeline as /analyze, streamed one event per stage as NDJSON,
+    or as server-sent events when the client accepts text/event-stream.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        async for event, payload in analysis_events(req):
+            message = json.dumps({"event": event, **payload}, ensure_ascii=False)
+            if sse:
+                yield f"event: {event}\ndata: {message}\n\n"
+            else:
+                yield message + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def score_texts(texts, languages=None):
+    """
+    Batched sentiment + severity for many texts, without roadmap or
+    YouTube. Shared by /analyze-batch and the offline bulk scorer
+    (python -m api.bulk_score).
+
+    Inputs over LONG_TEXT_CHARS go through long-document mode. Returns
+    one dict per input, or an {"error": ...} dict for inputs that are not
+    meaningful or could not be scored.
+    """
+    results = [None] * len(texts)
+
+    valid = []
+
+    for i, t in enumerate(texts):
+        if isinstance(t, str) and is_meaningful_text(t):
+            valid.append(i)
+        else:
+            results[i] = {
+                "error": "Input is too short or not meaningful for sentiment analysis."
+            }
+
+    if not valid:
+        return results
+
+    # 1️⃣ Detect language and translate each language group in one call
+    with STAGE_SECONDS.time(stage="detect_language", mode="batch"):
+        langs = {
+            i: languages[i] if languages and languages[i] not in (None, "auto") else detect_language(texts[i])
+            for i in valid
+        }
+
+    modes = {i: "long" if len(texts[i]) > LONG_TEXT_CHARS else "short" for i in valid}
+
+    def flatten(i, core):
+        # Long-document results carry segments instead of one translation
+        out = {"text": texts[i], "language": langs[i]}
+        out.update((k, v) for k, v in core.items() if k != "segments")
+        if "segments" in core:
+            out["translated"] = " ".join(seg["translated"] for seg in core["segments"])
+        return out
+
+    # Repeated inputs come straight from the result cache
+    result_keys = {}
+    if result_cache:
+        with STAGE_SECONDS.time(stage="result_cache", mode="batch"):
+            pending = []
+            for i in valid:
+                result_keys[i] = result_key(texts[i], langs[i], modes[i])
+                cached = result_cache.get(result_keys[i])
+                if cached is None:
+                    pending.append(i)
+                else:
+                    results[i] = flatten(i, cached)
+                    ANALYSES.inc(language=language_label(langs[i]), severity=cached["severity"])
+        valid = pending
+
+    # Long inputs are segmented one document at a time so none exceeds
+    # the models' windows; a failure only affects its own row
+    for i in [i for i in valid if modes[i] == "long"]:
+        try:
+            with STAGE_SECONDS.time(stage="long_document", mode="long"):
+                core = analyze_long_document(texts[i], langs[i])
+        except Exception as exc:
+            logger.exception("Long document failed", extra={"language": langs[i], "chars": len(texts[i])})
+            results[i] = {"text": texts[i], "language": langs[i], "error": f"Analysis failed: {type(exc).__name__}"}
+            continue
+
+        ANALYSES.inc(language=language_label(langs[i]), severity=core["severity"])
+        results[i] = flatten(i, core)
+        if result_cache:
+            result_cache.put(result_keys[i], core)
+
+    valid = [i for i in valid if modes[i] == "short"]
+
+    if not valid:
+        return results
+
+    texts_en = {}
+
+    groups = {}
+    for i in valid:
+        groups.setdefault(langs[i], []).append(i)
+
+    for lang, indices in groups.items():
+        if lang == "en":
+            for i in indices:
+                texts_en[i] = texts[i]
+            TRANSLATION_INPUTS.inc(len(indices), outcome="skipped")
+            continue
+
+        keys = {i: translation_key(texts[i], lang, "en") for i in indices}
+        missing = []
+
+        for i in indices:
+            cached = translation_cache.get(keys[i])
+            if cached is None:
+                missing.append(i)
+            else:
+                texts_en[i] = cached
+
+        TRANSLATION_INPUTS.inc(len(indices) - len(missing), outcome="cached")
+        TRANSLATION_INPUTS.inc(len(missing), outcome="translated")
+
+        for chunk in chunked(missing, BATCH_SIZE):
+            with STAGE_SECONDS.time(stage="translate", mode="batch"):
+                translated = translate_batch(
+                    [texts[i] for i in chunk], lang, "en"
+                )
+            for i, text_en in zip(chunk, translated):
+                texts_en[i] = text_en
+                translation_cache.put(keys[i], text_en)
+
+    ordered_en = [texts_en[i] for i in valid]
+
+    # 2️⃣ Sentiment over the whole batch
+    with STAGE_SECONDS.time(stage="sentiment", mode="batch"):
+        raw_results = classify_texts(ordered_en)
+
+    sentiments = [r["label"].lower() for r in raw_results]
+
+    # 3️⃣ Regex triggers first, one anchor-index search for the rest
+    with STAGE_SECONDS.time(stage="severity_regex", mode="batch"):
+        hits = [
+            risk_matcher.trigger(text_en, sentiments[k])
+            for k, text_en in enumerate(ordered_en)
+        ]
+    needs_semantic = [k for k, hit in enumerate(hits) if hit is None]
+    with STAGE_SECONDS.time(stage="severity_semantic", mode="batch"):
+        similarity = dict(zip(
+            needs_semantic,
+            semantic_risk_matches([ordered_en[k] for k in needs_semantic])
+        ))
+
+    for k, i in enumerate(valid):
+        severity, reason = severity_from_signals(sentiments[k], hits[k], similarity.get(k))
+        ANALYSES.inc(language=language_label(langs[i]), severity=severity)
+
+        results[i] = {
+            "text": texts[i],
+            "language": langs[i],
+            "translated": ordered_en[k],
+            "sentiment": sentiments[k],
+            "confidence": round(float(raw_results[k]["score"]), 3),
+            "severity": severity,
+            "severity_reason": reason
+        }
+
+    if result_cache:
+        result_cache.put_many([
+            (result_keys[i], {k: v for k, v in results[i].items() if k not in ("text", "language")})
+            for i in valid
+        ])
+
+    return results
+
 
 @app.post("/analyze-batch")
 def analyze_batch(req: BatchRequest):
+
+    start_time = time.time()
+
+    scored = score_texts(req.texts)
+    results = [r if "error" in r else None for r in scored]
+    valid = [r for r in scored if "error" not in r]
+
+    # 4️⃣ Roadmaps per language, YouTube once per distinct severity
+    roadmaps = {}
+    for lang in {r["language"] for r in valid}:
+        lang_severities = [r["severity"] for r in valid if r["language"] == lang]
+        with STAGE_SECONDS.time(stage="roadmap", mode="batch"):
+            roadmaps[lang] = translate_roadmaps(lang_severities, lang)
+
+    yt_cache = {}
+    for severity in {r["severity"] for r in valid}:
+        try:
+            yt_cache[severity] = youtube_search(
+                yt_query_for_severity(severity),
+                max_results=8
+            )
+        except Exception:
+            yt_cache[severity] = []
+
+    for i, r in enumerate(scored):
+        if "error" in r:
+            continue
+
+        lang = r["language"]
+        severity = r["severity"]
+
+        results[i] = {
+            "text": r["text"],
+            "sentiment": r["sentiment"],
+            "confidence": r["confidence"],
+            "severity": severity,
+            "roadmap": roadmaps[lang][severity],
+            "youtube_recommendations": yt_cache[severity],
+            "language": lang
+        }
+
+    logger.info("Batch finished", extra={
+        "seconds": round(time.time() - start_time, 3),
+        "items": len(req.texts)
+    })
+
+    return {"results": results}
+
+
+@app.get("/stats/batching")
+def batching_stats():
     return {
-        "results": [
-            analyze_text(TextRequest(text=t))
-            for t in req.texts
+        "enabled": MICROBATCH_ENABLED,
+        "batchers": [
+            sentiment_batcher.stats(),
+            similarity_batcher.stats()
         ]
     }
+
+
+@app.get("/stats/youtube-cache")
+def youtube_cache_stats():
+    return youtube_cache.stats()
+
+
+@app.get("/stats/translation-cache")
+def translation_cache_stats():
+    return translation_cache.stats()
+
+
+@app.get("/stats/result-cache")
+def result_cache_stats():
+    if not result_cache:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.stats()}
+
+
+@app.get("/stats/cascade")
+def cascade_stats_endpoint():
+    with cascade_lock:
+        texts = cascade_stats["texts"]
+        escalated = cascade_stats["escalated"]
+
+    return {
+        "enabled": CASCADE_ENABLED,
+        "confidence_threshold": CASCADE_CONFIDENCE,
+        "texts": texts,
+        "escalated": escalated,
+        "escalation_rate": round(escalated / texts, 3) if texts else 0.0
+    }
+
+
+def cache_lookups():
+    youtube = youtube_cache.stats()
+    translation = translation_cache.stats()
+
+    lookups = []
+    if result_cache:
+        lookups = [
+            ({"cache": "result", "result": "hit"}, result_cache.hits),
+            ({"cache": "result", "result": "miss"}, result_cache.misses)
+        ]
+
+    return lookups + [
+        ({"cache": "youtube", "result": "hit"}, youtube["hits"]),
+        ({"cache": "youtube", "result": "stale_hit"}, youtube["stale_hits"]),
+        ({"cache": "youtube", "result": "miss"}, youtube["misses"]),
+        ({"cache": "translation", "result": "hit"}, translation["hits"]),
+        ({"cache": "translation", "result": "disk_hit"}, translation["disk_hits"]),
+        ({"cache": "translation", "result": "miss"}, translation["misses"])
+    ]
+
+
+metrics_registry.callback(
+    "cache_lookups_total",
+    "Cache lookups by cache and result",
+    "counter",
+    cache_lookups
+)
+
+metrics_registry.callback(
+    "microbatch_queue_depth",
+    "Items waiting in each micro-batcher queue",
+    "gauge",
+    lambda: [
+        ({"batcher": stats["name"]}, stats["queue_depth"])
+        for stats in (sentiment_batcher.stats(), similarity_batcher.stats())
+    ]
+)
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    models = {name: resource.status() for name, resource in MODELS.items()}
+    ready = all(
+        MODELS[name].ready
+        for name in PRELOAD_MODELS
+        if name in MODELS and name not in warmup_skipped
+    )
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "preload": PRELOAD_MODELS,
+            "skipped": sorted(warmup_skipped),
+            "models": models
+        }
+    )
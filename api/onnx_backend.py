@@ -0,0 +1,280 @@
+"""
+ONNX Runtime backend for the sentiment classifier and the sentence
+embedder.
+
+Export once, then point INFERENCE_BACKEND at "onnx" or "onnx-int8":
+
+    python -m api.onnx_backend export
+    python -m api.onnx_backend parity
+
+Exports live under ONNX_DIR/<model name>/ as model.onnx, an optional
+model.int8.onnx, the saved tokenizer and, for the embedder,
+sentence_bert_config.json with the sequence length it was trained with.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+
+def model_dir(onnx_dir, model_name):
+    return os.path.join(onnx_dir, model_name.replace("/", "__"))
+
+
+def onnx_path(onnx_dir, model_name, quantized=False):
+    filename = "model.int8.onnx" if quantized else "model.onnx"
+    return os.path.join(model_dir(onnx_dir, model_name), filename)
+
+
+def export_model(model_name, onnx_dir, task, quantize=True, opset=17):
+    """
+    Exports `model_name` to ONNX with dynamic batch / sequence axes.
+    `task` is "classification" (logits) or "embedding" (last hidden state).
+    """
+    import torch
+
+    out_dir = model_dir(onnx_dir, model_name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    if task == "classification":
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        output_name = "logits"
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        # Loaded the way load_embedding_model does, so weights, tokenizer
+        # and truncation length match the PyTorch encoder
+        encoder = SentenceTransformer(model_name, device="cpu")
+        tokenizer = encoder.tokenizer
+        model = encoder[0].auto_model
+        output_name = "last_hidden_state"
+
+        with open(os.path.join(out_dir, "sentence_bert_config.json"), "w", encoding="utf-8") as f:
+            json.dump({"max_seq_length": encoder.max_seq_length}, f)
+
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+
+    class FirstOutput(torch.nn.Module):
+        # Exposes only logits / last_hidden_state as a plain tensor
+
+        def __init__(self, wrapped):
+            super().__init__()
+            self.wrapped = wrapped
+
+        def forward(self, input_ids, attention_mask=None):
+            return self.wrapped(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes[output_name] = {0: "batch"}
+
+    path = onnx_path(onnx_dir, model_name)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            FirstOutput(model),
+            tuple(sample[name] for name in input_names),
+            path,
+            input_names=input_names,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False
+        )
+
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantize_dynamic(
+            path,
+            onnx_path(onnx_dir, model_name, quantized=True),
+            weight_type=QuantType.QInt8
+        )
+
+    print("Exported", model_name, "->", out_dir)
+
+
+def create_session(path, num_threads=None):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+
+    return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+
+def export_max_length(directory, default=512):
+    """The embedder's max_seq_length saved at export, else `default`."""
+    path = os.path.join(directory, "sentence_bert_config.json")
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("max_seq_length") or default
+
+
+class OnnxModel:
+
+    def __init__(self, model_name, onnx_dir, quantized=False, num_threads=None, max_length=None):
+        from transformers import AutoConfig, AutoTokenizer
+
+        directory = model_dir(onnx_dir, model_name)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.config = AutoConfig.from_pretrained(directory)
+        self.session = create_session(
+            onnx_path(onnx_dir, model_name, quantized),
+            num_threads=num_threads
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.max_length = max_length or export_max_length(directory)
+
+    def run(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(None, feeds)[0], encoded["attention_mask"]
+
+
+class OnnxSentimentClassifier(OnnxModel):
+    """
+    Drop-in for the HuggingFace text-classification pipeline: returns
+    one {"label", "score"} dict per input text.
+    """
+
+    def __call__(self, texts, batch_size=32, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            logits, _ = self.run(texts[start:start + batch_size])
+
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+
+            for row in probs:
+                best = int(row.argmax())
+                results.append({
+                    "label": self.config.id2label[best],
+                    "score": float(row[best])
+                })
+
+        return results
+
+
+class OnnxSentenceEncoder(OnnxModel):
+    """
+    Drop-in for SentenceTransformer.encode with mean pooling, which is
+    what paraphrase-multilingual-MiniLM-L12-v2 uses. Inputs are truncated
+    at the max_seq_length recorded at export (128 for that model), as
+    SentenceTransformer does.
+    """
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, convert_to_tensor=False, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            hidden, mask = self.run(texts[start:start + batch_size])
+
+            mask = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            chunks.append(pooled)
+
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        if convert_to_tensor:
+            import torch
+            embeddings = torch.from_numpy(embeddings)
+
+        return embeddings[0] if single else embeddings
+
+
+def parity_report(texts, torch_classifier, onnx_classifier, torch_encoder, onnx_encoder):
+    """
+    Label agreement and max score gap for the classifier, and mean /
+    min cosine similarity between PyTorch and ONNX embeddings.
+    """
+    torch_labels = torch_classifier(texts, truncation=True)
+    onnx_labels = onnx_classifier(texts)
+
+    agreement = np.mean([
+        a["label"].lower() == b["label"].lower()
+        for a, b in zip(torch_labels, onnx_labels)
+    ])
+    score_gap = max(
+        abs(a["score"] - b["score"])
+        for a, b in zip(torch_labels, onnx_labels)
+    )
+
+    a = np.asarray(torch_encoder.encode(texts, convert_to_numpy=True))
+    b = np.asarray(onnx_encoder.encode(texts, convert_to_numpy=True))
+    cosine = (a * b).sum(axis=1) / (
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    )
+
+    return {
+        "texts": len(texts),
+        "label_agreement": round(float(agreement), 4),
+        "max_score_gap": round(float(score_gap), 4),
+        "embedding_cosine_mean": round(float(cosine.mean()), 4),
+        "embedding_cosine_min": round(float(cosine.min()), 4)
+    }
+
+
+def main():
+    from api import main as app_main
+
+    parser = argparse.ArgumentParser(description="Export and check ONNX models")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--quantized", action="store_true", help="check the int8 variant")
+    parser.add_argument("--texts", default="data/processed/binary_sentiment_clean.csv")
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_model(app_main.SENTIMENT_MODEL, app_main.ONNX_DIR, "classification", quantize=not args.no_quantize)
+        export_model(app_main.EMBEDDING_MODEL, app_main.ONNX_DIR, "embedding", quantize=not args.no_quantize)
+        return
+
+    import pandas as pd
+
+    texts = pd.read_csv(args.texts)["benefitsReview"].dropna().astype(str).head(args.limit).tolist()
+
+    report = parity_report(
+        texts,
+        app_main.load_sentiment_classifier(backend="torch"),
+        OnnxSentimentClassifier(app_main.SENTIMENT_MODEL, app_main.ONNX_DIR, quantized=args.quantized),
+        app_main.load_embedding_model(backend="torch"),
+        OnnxSentenceEncoder(app_main.EMBEDDING_MODEL, app_main.ONNX_DIR, quantized=args.quantized)
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+fp32 vs int8 dynamic-quantization harness for every PyTorch model in
+api/main.py. Scores the same inputs with both variants and reports
+agreement, latency and serialized model size:
+
+    python -m api.quantization --limit 300
+    python -m api.quantization --models sentiment,embedding --output quantization_report.json
+"""
+
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from api import main as app_main
+from api.test_cases import load_test_case_inputs
+
+
+def model_size_mb(module):
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return round(buffer.tell() / (1024 * 1024), 2)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def compare_sentiment(texts, gold):
+    report = {}
+    labels = {}
+
+    for name, quantize in (("fp32", False), ("int8", True)):
+        classifier = app_main.load_sentiment_classifier(backend="torch", quantize=quantize)
+        results, seconds = timed(
+            classifier, texts, batch_size=app_main.BATCH_SIZE, truncation=True
+        )
+        labels[name] = [r["label"].lower() for r in results]
+
+        # Binary accuracy only over rows that have a gold label
+        correct = [
+            ("negative" if label == "negative" else "positive") == g
+            for label, g in zip(labels[name], gold)
+            if g is not None
+        ]
+        report[name] = {
+            "ms_per_text": round(1000 * seconds / len(texts), 2),
+            "size_mb": model_size_mb(classifier.model),
+            "binary_accuracy": round(float(np.mean(correct)), 4) if correct else None
+        }
+
+    report["label_agreement"] = round(
+        float(np.mean([a == b for a, b in zip(labels["fp32"], labels["int8"])])), 4
+    )
+    return report
+
+
+def compare_embedding(texts):
+    report = {}
+    vectors = {}
+
+    for name, quantize in (("fp32", False), ("int8", True)):
+        encoder = app_main.load_embedding_model(backend="torch", quantize=quantize)
+        vectors[name], seconds = timed(
+            encoder.encode, texts, batch_size=app_main.BATCH_SIZE, convert_to_numpy=True
+        )
+        report[name] = {
+            "ms_per_text": round(1000 * seconds / len(texts), 2),
+            "size_mb": model_size_mb(encoder[0].auto_model)
+        }
+
+    a, b = vectors["fp32"], vectors["int8"]
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+    report["cosine_mean"] = round(float(cosine.mean()), 4)
+    report["cosine_min"] = round(float(cosine.min()), 4)
+
+    index = app_main.risk_anchor_index.get()
+    triggered = {
+        name: [
+            app_main.semantic_trigger(matches) is not None
+            for matches in index.search(vectors[name], k=app_main.RISK_ANCHOR_TOP_K)
+        ]
+        for name in vectors
+    }
+    report["risk_trigger_agreement"] = round(
+        float(np.mean([x == y for x, y in zip(triggered["fp32"], triggered["int8"])])), 4
+    )
+    return report
+
+
+def compare_translator(texts, langs):
+    report = {}
+    outputs = {}
+
+    for name, quantize in (("fp32", False), ("int8", True)):
+        tokenizer, model = app_main.load_translator(quantize=quantize)
+
+        start = time.perf_counter()
+        outputs[name] = [
+            text
+            for lang in langs
+            for text in app_main.translate_batch(texts, "en", lang, models=(tokenizer, model))
+        ]
+        seconds = time.perf_counter() - start
+
+        report[name] = {
+            "ms_per_text": round(1000 * seconds / len(outputs[name]), 2),
+            "size_mb": model_size_mb(model)
+        }
+
+    report["exact_match"] = round(
+        float(np.mean([a == b for a, b in zip(outputs["fp32"], outputs["int8"])])), 4
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 models")
+    parser.add_argument("--dataset", default="data/processed/binary_sentiment_clean.csv")
+    parser.add_argument("--test-cases", default="TEST_CASES.md")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--models", default="sentiment,embedding,translator")
+    parser.add_argument("--translate-to", default="hi,ta")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.dataset).dropna().head(args.limit)
+    test_cases = load_test_case_inputs(args.test_cases)
+
+    texts = test_cases + df["benefitsReview"].astype(str).tolist()
+    gold = [None] * len(test_cases) + df["binary_sentiment"].tolist()
+
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    report = {"texts": len(texts)}
+
+    if "sentiment" in models:
+        report["sentiment"] = compare_sentiment(texts, gold)
+
+    if "embedding" in models:
+        report["embedding"] = compare_embedding(texts)
+
+    if "translator" in models:
+        report["translator"] = compare_translator(
+            test_cases,
+            [lang.strip() for lang in args.translate_to.split(",") if lang.strip()]
+        )
+
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResultCache:
+    """
+    Content-addressed SQLite store for full analysis results.
+
+    Keys are hashes of (version, parts...), so results computed by an
+    older pipeline version are simply never looked up again; they are
+    deleted when the cache opens and by the age / size eviction that
+    runs every `evict_every` writes. The file can be shared by several
+    processes (WAL mode).
+    """
+
+    def __init__(self, path, version, max_bytes=256 * 1024 * 1024, max_age=7 * 86400, evict_every=200):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connect()
+
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE version != ?", (version,))
+            self._db.commit()
+        self.evict()
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, version TEXT, value TEXT, size INTEGER, "
+            "created_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        self._db.commit()
+
+    def _after_fork(self):
+        # Each process needs its own SQLite connection
+        self._lock = threading.Lock()
+        self._connect()
+
+    def key(self, *parts):
+        payload = json.dumps([self.version, *parts], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Writes (key, value) pairs in one transaction."""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            encoded = json.dumps(value, ensure_ascii=False)
+            rows.append((key, self.version, encoded, len(encoded), now, now))
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+            due = self._writes // self.evict_every != (self._writes + len(rows)) // self.evict_every
+            self._writes += len(rows)
+
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until under max_bytes."""
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+            if total > self.max_bytes:
+                # Trim to 90% so eviction does not run on every write at the cap
+                target = total - int(self.max_bytes * 0.9)
+                freed = 0
+                doomed = []
+                for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= target:
+                        break
+                self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+                removed += len(doomed)
+
+            self._db.commit()
+            self.evicted += removed
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "max_age_seconds": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,164 @@
+"""
+Multi-worker serving that loads the models once.
+
+    python -m api.serve --workers 4 --port 8000
+
+The parent process imports api.main, loads (and quantizes) every model
+in PRELOAD_MODELS, then forks the workers. Workers share the model
+weights copy-on-write instead of each loading its own copy, and each
+gets an equal share of the cores for torch's thread pools. Dead workers
+are re-forked from the already-loaded parent. POSIX only (needs fork).
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+from api.threads import available_cpus, configure_torch_threads, thread_budget
+
+logger = logging.getLogger("api.serve")
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload(app_main):
+    """Loads PRELOAD_MODELS in this process so forked workers inherit them."""
+    start = time.time()
+
+    for name in app_main.PRELOAD_MODELS:
+        resource = app_main.MODELS.get(name)
+        if resource is None:
+            logger.warning("Unknown model in PRELOAD_MODELS", extra={"model": name})
+            continue
+        if app_main.skip_preload(name):
+            continue
+        try:
+            resource.get()
+        except Exception:
+            # Workers retry on first use, as with the background warmup
+            logger.exception("Preload failed", extra={"model": name})
+
+    # Move everything loaded so far out of the collector's reach: otherwise
+    # GC passes in the workers touch these objects' headers and copy the
+    # shared pages one by one
+    gc.collect()
+    gc.freeze()
+
+    logger.info("Preloaded models", extra={
+        "seconds": round(time.time() - start, 2),
+        "models": app_main.PRELOAD_MODELS
+    })
+
+
+def run_worker(app, sock, intra, inter, args):
+    import uvicorn
+
+    configure_torch_threads(intra, inter)
+
+    logger.info("Worker started", extra={
+        "pid": os.getpid(),
+        "torch_threads": intra,
+        "torch_interop_threads": inter
+    })
+
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_keep_alive=args.keep_alive,
+        lifespan="on"
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock, intra, inter, args):
+    pid = os.fork()
+
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            run_worker(app, sock, intra, inter, args)
+        finally:
+            os._exit(0)
+
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preload the models once and fork server workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    intra, inter = thread_budget(args.workers)
+    intra = args.threads or intra
+
+    # One thread in the parent: it only loads weights, and an OpenMP pool
+    # started before fork() is not safe to use in the children. Inter-op
+    # threads stay unset here so each worker can still choose its own.
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    os.environ["TORCH_THREADS"] = "1"
+    os.environ["TORCH_INTEROP_THREADS"] = "0"
+
+    from api import main as app_main
+
+    logger.info("Serving", extra={
+        "workers": args.workers,
+        "cpus": available_cpus(),
+        "torch_threads_per_worker": intra,
+        "torch_interop_threads_per_worker": inter
+    })
+
+    preload(app_main)
+
+    sock = bind_socket(args.host, args.port)
+    workers = {spawn(app_main.app, sock, intra, inter, args) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        workers.discard(pid)
+
+        if not stopping:
+            logger.warning("Worker exited, restarting", extra={"pid": pid, "status": status})
+            time.sleep(1)
+            workers.add(spawn(app_main.app, sock, intra, inter, args))
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
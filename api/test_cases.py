@@ -0,0 +1,14 @@
+def load_test_case_inputs(path="TEST_CASES.md"):
+    """
+    The line following each `Input:` marker in TEST_CASES.md. Kept free
+    of the app's imports so benchmarks can read the corpus without
+    loading api.main.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+
+    return [
+        lines[i + 1]
+        for i, line in enumerate(lines[:-1])
+        if line == "Input:" and lines[i + 1]
+    ]
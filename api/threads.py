@@ -0,0 +1,40 @@
+import os
+
+
+def available_cpus():
+    """Cores this process may run on (respects taskset / cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def thread_budget(workers=1, cpus=None):
+    """
+    (intra_op, inter_op) torch threads per process so `workers`
+    processes together use each core once instead of each assuming
+    the whole machine.
+    """
+    cpus = cpus or available_cpus()
+    intra = max(1, cpus // max(1, workers))
+    inter = 1 if intra < 4 else 2
+    return intra, inter
+
+
+def configure_torch_threads(intra, inter=0):
+    """
+    Applies the thread counts to torch. `inter` = 0 leaves the inter-op
+    pool alone: torch only accepts it once per process, before any
+    inter-op work, so a preloading parent skips it and each forked
+    worker sets its own.
+    """
+    import torch
+
+    torch.set_num_threads(intra)
+
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError:
+            # Already set, or inter-op work has started in this process
+            pass
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with a per-entry TTL and stale-while-revalidate.
+
+    Fresh entries are returned directly. Expired entries are still
+    returned, but trigger a single background refresh through `loader`.
+    Entries older than `ttl + stale_ttl` are treated as misses and
+    loaded synchronously; concurrent misses on one key share a single
+    `loader` call. A loader that raises stores nothing, so a failed
+    refresh never replaces the last good value, and a failed load falls
+    back to it when there is one. Keys must be strings when
+    `persist_path` is set, since the cache is written to disk as JSON.
+    """
+
+    def __init__(self, loader, ttl=3600, stale_ttl=86400, max_entries=64, persist_path=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        if persist_path:
+            self._load()
+
+    def get(self, key, *args):
+        now = time.time()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None:
+                age = now - entry["stored_at"]
+
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry["value"]
+
+                if age < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, args),
+                            daemon=True
+                        ).start()
+                    return entry["value"]
+
+            self.misses += 1
+
+            # Only the first caller loads; the others wait for its result
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = self.loader(*args)
+        except Exception as exc:
+            if entry is None:
+                future.set_exception(exc)
+                raise
+            logger.warning("Load failed, serving expired entry", extra={"key": key, "error": repr(exc)})
+            future.set_result(entry["value"])
+            return entry["value"]
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, key, args):
+        try:
+            self._store(key, self.loader(*args))
+        except Exception as exc:
+            logger.warning("Background refresh failed", extra={"key": key, "error": repr(exc)})
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = {"value": value, "stored_at": time.time()}
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+            snapshot = dict(self._data) if self.persist_path else None
+
+        if snapshot is not None:
+            self._save(snapshot)
+
+    def _load(self):
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable cache file", extra={"path": self.persist_path, "error": repr(exc)})
+            return
+
+        entries = sorted(data.items(), key=lambda kv: kv[1]["stored_at"])
+        self._data = OrderedDict(entries[-self.max_entries:])
+
+    def _save(self, snapshot):
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+        tmp_path = f"{self.persist_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses
+            }
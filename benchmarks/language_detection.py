@@ -0,0 +1,132 @@
+"""
+Accuracy and speed of the script-aware language detector against the
+previous approach (langid over all its languages, unsupported results
+mapped to English).
+
+    python -m benchmarks.language_detection --corpus data/language_eval.jsonl
+    python -m benchmarks.language_detection --build --save data/language_eval.jsonl
+
+The corpus is JSONL of {"text", "language"}. --build makes one by
+translating the TEST_CASES.md and requests.jsonl inputs into every
+LANG_MAP language with the API's translator.
+"""
+
+import argparse
+import json
+import os
+import time
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_corpus(app_main, test_cases_path, requests_path, limit):
+    from benchmarks.stage_latency import load_corpus as load_texts
+
+    texts = [t for t in load_texts(test_cases_path, requests_path) if len(t) < 400][:limit]
+    corpus = [{"text": t, "language": "en"} for t in texts]
+
+    for lang in app_main.LANG_MAP:
+        if lang == "en":
+            continue
+        print("Translating to", lang)
+        for start in range(0, len(texts), app_main.BATCH_SIZE):
+            chunk = texts[start:start + app_main.BATCH_SIZE]
+            for translated in app_main.translate_batch(chunk, "en", lang):
+                corpus.append({"text": translated, "language": lang})
+
+    return corpus
+
+
+def langid_all(lang_map):
+    import langid
+
+    def detect(text):
+        code, _ = langid.classify(text)
+        return code if code in lang_map else "en"
+
+    return detect
+
+
+def evaluate(name, detect, corpus, repeats):
+    detect(corpus[0]["text"])  # load models outside the timing
+
+    predictions = [detect(item["text"]) for item in corpus]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in corpus:
+            detect(item["text"])
+    seconds = time.perf_counter() - start
+
+    per_language = {}
+    confusions = {}
+    for item, predicted in zip(corpus, predictions):
+        stats = per_language.setdefault(item["language"], {"n": 0, "correct": 0})
+        stats["n"] += 1
+        if predicted == item["language"]:
+            stats["correct"] += 1
+        else:
+            key = f"{item['language']}->{predicted}"
+            confusions[key] = confusions.get(key, 0) + 1
+
+    correct = sum(s["correct"] for s in per_language.values())
+
+    return {
+        "detector": name,
+        "accuracy": round(correct / len(corpus), 4),
+        "us_per_text": round(1e6 * seconds / (repeats * len(corpus)), 1),
+        "per_language": {
+            lang: round(s["correct"] / s["n"], 4)
+            for lang, s in sorted(per_language.items())
+        },
+        "confusions": dict(sorted(confusions.items(), key=lambda kv: -kv[1]))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language detection accuracy and speed")
+    parser.add_argument("--corpus", default="data/language_eval.jsonl")
+    parser.add_argument("--build", action="store_true", help="translate a corpus with the API's translator")
+    parser.add_argument("--save", default=None, help="where --build writes the corpus")
+    parser.add_argument("--test-cases", default="TEST_CASES.md")
+    parser.add_argument("--requests", default="requests.jsonl")
+    parser.add_argument("--limit", type=int, default=100, help="English source texts for --build")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PRELOAD_MODELS", "")
+    from api import main as app_main
+    from api.language import ScriptLanguageDetector
+
+    if args.build:
+        corpus = build_corpus(app_main, args.test_cases, args.requests, args.limit)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                for item in corpus:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    else:
+        corpus = load_corpus(args.corpus)
+
+    script_detector = ScriptLanguageDetector(app_main.LANG_MAP)
+
+    report = {
+        "texts": len(corpus),
+        "results": [
+            evaluate("langid_all", langid_all(app_main.LANG_MAP), corpus, args.repeats),
+            evaluate("script_aware", lambda t: script_detector.detect(t)[0], corpus, args.repeats)
+        ]
+    }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
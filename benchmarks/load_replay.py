@@ -0,0 +1,453 @@
+"""
+Replay-based load generator for a running API instance.
+
+    # closed loop: N concurrent clients, one run per level
+    python -m benchmarks.load_replay requests.jsonl --url http://127.0.0.1:8000 --concurrency 1,4,16,64
+
+    # open loop: Poisson arrivals at a fixed rate, regardless of response times
+    python -m benchmarks.load_replay requests.jsonl --rate 5,10,20 --duration 60
+
+    # start the YouTube stub and a local server pointed at it
+    python -m benchmarks.load_replay TEST_CASES.md --spawn-server --stub-latency-ms 120 --stub-error-rate 0.02
+
+Inputs are JSONL (requests.jsonl, or recorded traffic with optional
+"endpoint", "payload" and "timestamp" fields), TEST_CASES.md, or a CSV
+with --text-column. --language-mix en=0.6,hi=0.3,ta=0.1 samples texts by
+language; with --translate, languages missing from the corpus are
+produced locally through the API's own translate_batch. Each run
+reports throughput and p50/p95/p99 latency, overall and per endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import langid
+
+from api.test_cases import load_test_case_inputs
+from benchmarks.youtube_stub import YouTubeStub
+
+DEFAULT_ENDPOINT = "/analyze"
+
+
+# =========================
+# CORPUS
+# =========================
+
+def read_test_cases(path):
+    return [{"payload": {"text": text}} for text in load_test_case_inputs(path)]
+
+
+def record_from_json(entry):
+    """
+    One replayable request from a JSONL line: recorded traffic
+    ({"endpoint", "payload", "timestamp"}), a bare /analyze payload
+    ({"text", "language"}) or a work-order line ({"title", "body"}).
+    """
+    if "payload" in entry:
+        return {
+            "endpoint": entry.get("endpoint", DEFAULT_ENDPOINT),
+            "payload": entry["payload"],
+            "timestamp": entry.get("timestamp")
+        }
+
+    if "text" in entry or "texts" in entry:
+        payload = {k: entry[k] for k in ("text", "texts", "language", "mode") if k in entry}
+        return {"endpoint": entry.get("endpoint", DEFAULT_ENDPOINT), "payload": payload, "timestamp": entry.get("timestamp")}
+
+    text = entry.get("body") or entry.get("title")
+    return {"payload": {"text": text}} if text else None
+
+
+def load_records(path, text_column=None):
+    if path.endswith(".md"):
+        records = read_test_cases(path)
+    elif path.endswith(".csv") or path.endswith(".tsv"):
+        import pandas as pd
+
+        frame = pd.read_csv(path, sep="\t" if path.endswith(".tsv") else ",")
+        column = text_column or "text"
+        records = [{"payload": {"text": t}} for t in frame[column].dropna().astype(str)]
+    else:
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = record_from_json(json.loads(line))
+                    if record:
+                        records.append(record)
+
+    for record in records:
+        record.setdefault("endpoint", DEFAULT_ENDPOINT)
+        record.setdefault("timestamp", None)
+
+    return records
+
+
+def record_language(record):
+    payload = record["payload"]
+    if payload.get("language") and payload["language"] != "auto":
+        return payload["language"]
+    text = payload.get("text") or " ".join(payload.get("texts", []))
+    return langid.classify(text)[0]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        lang, _, weight = part.partition("=")
+        if lang.strip():
+            mix[lang.strip()] = float(weight or 1)
+    return mix
+
+
+def apply_language_mix(records, mix, translate=False):
+    """
+    Groups records by language and returns a sampler drawing each
+    language with its weight in `mix`.
+    """
+    pools = {}
+    for record in records:
+        pools.setdefault(record_language(record), []).append(record)
+
+    missing = [lang for lang in mix if lang not in pools]
+
+    if missing and translate:
+        from api import main as app_main
+
+        english = [r for r in pools.get("en", []) if "text" in r["payload"]]
+        if not english:
+            raise SystemExit("--translate needs English /analyze records to translate from")
+
+        texts = [r["payload"]["text"] for r in english]
+        for lang in missing:
+            print(f"Translating {len(texts)} texts to {lang}")
+            translated = []
+            for start in range(0, len(texts), app_main.BATCH_SIZE):
+                translated.extend(app_main.translate_batch(texts[start:start + app_main.BATCH_SIZE], "en", lang))
+            pools[lang] = [
+                {**r, "payload": {**r["payload"], "text": t}}
+                for r, t in zip(english, translated)
+            ]
+        missing = []
+
+    if missing:
+        raise SystemExit(
+            f"No records for {missing} in the corpus (found: {sorted(pools)}); "
+            "pass --translate to generate them"
+        )
+
+    languages = list(mix)
+    weights = [mix[lang] for lang in languages]
+
+    def sample(rng):
+        lang = rng.choices(languages, weights)[0]
+        return rng.choice(pools[lang])
+
+    return sample
+
+
+# =========================
+# RUNS
+# =========================
+
+class RunStats:
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint, seconds, ok, reason=None):
+        if ok:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+        else:
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        all_latencies = [s for values in self.latencies.values() for s in values]
+
+        report = {
+            "seconds": round(elapsed, 2),
+            "completed": len(all_latencies),
+            "errors": sum(self.errors.values()),
+            "error_reasons": self.errors,
+            "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+            **latency_summary(all_latencies)
+        }
+        if len(self.latencies) > 1:
+            report["endpoints"] = {
+                endpoint: latency_summary(values)
+                for endpoint, values in sorted(self.latencies.items())
+            }
+        return report
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(seconds):
+    if not seconds:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+
+    ms = [s * 1000 for s in seconds]
+    return {
+        "p50_ms": round(percentile(ms, 0.50), 1),
+        "p95_ms": round(percentile(ms, 0.95), 1),
+        "p99_ms": round(percentile(ms, 0.99), 1),
+        "mean_ms": round(statistics.fmean(ms), 1)
+    }
+
+
+async def send(client, record, stats):
+    start = time.perf_counter()
+    try:
+        response = await client.post(record["endpoint"], json=record["payload"])
+        # /analyze reports bad input as 200 + {"error"}; still a served request
+        ok = response.status_code < 400
+        reason = None if ok else f"http_{response.status_code}"
+    except httpx.HTTPError as exc:
+        ok, reason = False, type(exc).__name__
+
+    stats.record(record["endpoint"], time.perf_counter() - start, ok, reason)
+
+
+async def closed_loop(client, sample, concurrency, duration, rng):
+    """`concurrency` clients, each sending its next request as soon as the last one returns."""
+    stats = RunStats()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await send(client, sample(rng), stats)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.finished = time.perf_counter()
+    return stats
+
+
+async def open_loop(client, sample, rate, duration, rng, max_in_flight):
+    """
+    Poisson arrivals at `rate` requests/s. Requests are fired on
+    schedule whether or not earlier ones have finished, so queueing in
+    the server shows up as latency instead of a lower send rate.
+    """
+    stats = RunStats()
+    tasks = set()
+    start = time.perf_counter()
+    next_at = start
+    dropped = 0
+
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if len(tasks) >= max_in_flight:
+            dropped += 1
+        else:
+            task = asyncio.ensure_future(send(client, sample(rng), stats))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        next_at += rng.expovariate(rate)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    stats.finished = time.perf_counter()
+    if dropped:
+        stats.errors["client_overloaded"] = dropped
+    return stats
+
+
+async def timed_replay(client, records, speed, max_in_flight):
+    """Replays records at their recorded `timestamp` offsets, scaled by `speed`."""
+    stats = RunStats()
+    tasks = set()
+    ordered = sorted(records, key=lambda r: r["timestamp"])
+    first = ordered[0]["timestamp"]
+    start = time.perf_counter()
+
+    for record in ordered:
+        delay = (record["timestamp"] - first) / speed - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if len(tasks) >= max_in_flight:
+            stats.errors["client_overloaded"] = stats.errors.get("client_overloaded", 0) + 1
+            continue
+
+        task = asyncio.ensure_future(send(client, record, stats))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    stats.finished = time.perf_counter()
+    return stats
+
+
+# =========================
+# LOCAL SERVER
+# =========================
+
+def spawn_server(port, youtube_base, extra_env=None):
+    env = dict(os.environ, YOUTUBE_API_BASE=youtube_base, **(extra_env or {}))
+    env.setdefault("YOUTUBE_API_KEY", "load-test")
+
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port)],
+        env=env
+    )
+
+
+def wait_until_ready(url, timeout):
+    deadline = time.time() + timeout
+
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/readyz", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+
+    raise SystemExit(f"{url} was not ready after {timeout}s")
+
+
+def parse_list(spec, cast):
+    return [cast(x) for x in spec.split(",") if x.strip()] if spec else []
+
+
+async def run_all(args, records, sample):
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    timeout = httpx.Timeout(args.timeout)
+    rng = random.Random(args.seed)
+    results = []
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+        if args.warmup:
+            await closed_loop(client, sample, 1, args.warmup, rng)
+
+        if args.replay_timing:
+            stats = await timed_replay(client, records, args.speed, args.max_in_flight)
+            results.append({"mode": "replay", "speed": args.speed, **stats.summary()})
+            print_row(results[-1])
+
+        for concurrency in parse_list(args.concurrency, int):
+            stats = await closed_loop(client, sample, concurrency, args.duration, rng)
+            results.append({"mode": "closed", "concurrency": concurrency, **stats.summary()})
+            print_row(results[-1])
+
+        for rate in parse_list(args.rate, float):
+            stats = await open_loop(client, sample, rate, args.duration, rng, args.max_in_flight)
+            results.append({"mode": "open", "rate_rps": rate, **stats.summary()})
+            print_row(results[-1])
+
+    return results
+
+
+def print_row(result):
+    if result["mode"] == "closed":
+        load = f"c={result['concurrency']}"
+    elif result["mode"] == "open":
+        load = f"{result['rate_rps']} rps"
+    else:
+        load = f"x{result['speed']}"
+    print(
+        f"{result['mode']:6s} {load:>10s}  {result['throughput_rps']:7.2f} req/s  "
+        f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay traffic against the API")
+    parser.add_argument("corpus", help="requests.jsonl, recorded traffic (.jsonl), TEST_CASES.md or a CSV")
+    parser.add_argument("--text-column", default=None)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default=None, help="closed-loop levels, e.g. 1,4,16")
+    parser.add_argument("--rate", default=None, help="open-loop arrival rates in req/s, e.g. 5,10,20")
+    parser.add_argument("--replay-timing", action="store_true", help="replay recorded timestamps")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression for --replay-timing")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per run")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of single-client traffic before measuring")
+    parser.add_argument("--language-mix", default=None, help="e.g. en=0.6,hi=0.3,ta=0.1")
+    parser.add_argument("--translate", action="store_true", help="translate English records for missing mix languages")
+    parser.add_argument("--endpoint", default=None, help="override the endpoint of every record")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--spawn-server", action="store_true", help="start the YouTube stub and a local uvicorn")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--stub-latency-ms", type=float, default=100)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--ready-timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    if not (args.concurrency or args.rate or args.replay_timing):
+        args.concurrency = "1,4,16"
+
+    records = load_records(args.corpus, args.text_column)
+    if args.endpoint:
+        for record in records:
+            record["endpoint"] = args.endpoint
+    if not records:
+        raise SystemExit(f"No requests found in {args.corpus}")
+    if args.replay_timing and any(r["timestamp"] is None for r in records):
+        raise SystemExit("--replay-timing needs a \"timestamp\" on every record")
+
+    if args.language_mix:
+        sample = apply_language_mix(records, parse_mix(args.language_mix), args.translate)
+    else:
+        sample = lambda rng: rng.choice(records)
+
+    stub = server = None
+    if args.spawn_server:
+        stub = YouTubeStub(latency_ms=args.stub_latency_ms, error_rate=args.stub_error_rate, seed=args.seed).start()
+        server = spawn_server(args.port, stub.base_url)
+        args.url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        wait_until_ready(args.url, args.ready_timeout)
+        results = asyncio.run(run_all(args, records, sample))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if stub:
+            print("YouTube stub served", stub.requests, "requests")
+            stub.stop()
+
+    report = {
+        "corpus": args.corpus,
+        "records": len(records),
+        "language_mix": args.language_mix,
+        "duration_per_run": args.duration,
+        "runs": results
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Per-stage latency benchmark for the /analyze pipeline with regression
+baselines.
+
+    python -m benchmarks.stage_latency                      # compare against the baseline
+    python -m benchmarks.stage_latency --update-baseline    # record a new baseline
+
+Each stage is timed on its own over TEST_CASES.md and requests.jsonl
+inputs, bucketed by length and (via translation at setup) by language.
+YouTube calls go to a local stub. The run exits with status 1 when any
+stage's p50 is slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from api.test_cases import load_test_case_inputs
+from benchmarks.youtube_stub import YouTubeStub
+
+BASELINE_PATH = os.path.join("benchmarks", "baselines", "stage_latency.json")
+
+LENGTH_BUCKETS = [("short", 0, 80), ("medium", 80, 400), ("long", 400, None)]
+
+
+def load_corpus(test_cases_path, requests_path):
+    texts = load_test_case_inputs(test_cases_path)
+
+    if os.path.exists(requests_path):
+        with open(requests_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    texts.extend(t for t in (record.get("title"), record.get("body")) if t)
+
+    return texts
+
+
+def bucket_of(text):
+    for name, low, high in LENGTH_BUCKETS:
+        if len(text) >= low and (high is None or len(text) < high):
+            return name
+
+
+def bucketed(texts, per_bucket):
+    buckets = {name: [] for name, _, _ in LENGTH_BUCKETS}
+    for text in texts:
+        bucket = buckets[bucket_of(text)]
+        if len(bucket) < per_bucket:
+            bucket.append(text)
+
+    # TEST_CASES.md is mostly short lines; pad the long bucket with
+    # concatenated inputs so segmentation-sized texts are always covered
+    shorter = buckets["short"] + buckets["medium"]
+    while shorter and len(buckets["long"]) < per_bucket:
+        start = len(buckets["long"])
+        text = ""
+        for i in range(start, start + len(shorter)):
+            if len(text) >= 600:
+                break
+            text = f"{text} {shorter[i % len(shorter)]}".strip()
+        buckets["long"].append(text)
+
+    return {name: items for name, items in buckets.items() if items}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_calls(fn, inputs, repeats):
+    timings = []
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "n": len(timings),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3)
+    }
+
+
+def run_stages(app_main, corpora, repeats):
+    """corpora: {lang: {bucket: [texts]}}, English entries aligned with the others."""
+    embedder = app_main.embedding_model.get()
+    index = app_main.risk_anchor_index.get()
+    results = {}
+
+    def record(stage, lang, bucket, fn, inputs):
+        fn(inputs[0])  # warm-up, untimed
+        results[f"{stage}/{lang}/{bucket}"] = time_calls(fn, inputs, repeats)
+
+    for lang, buckets in corpora.items():
+        for bucket, texts in buckets.items():
+            record("detect_language", lang, bucket, app_main.detect_language, texts)
+
+            if lang != "en":
+                record("translate", lang, bucket, lambda t: app_main.translate_uncached(t, lang, "en"), texts)
+
+            english = corpora["en"][bucket]
+
+            if lang == "en":
+                record("sentiment_classifier", lang, bucket, lambda t: app_main.sentiment_classifier([t], truncation=True), english)
+                record("severity_regex", lang, bucket, lambda t: app_main.risk_matcher.trigger(t, "negative"), english)
+                record("severity_embedding", lang, bucket, lambda t: embedder.encode([t], convert_to_numpy=True), english)
+
+                vectors = embedder.encode(english, convert_to_numpy=True)
+                record("severity_cos_sim", lang, bucket, lambda v: index.search(v[None, :], k=app_main.RISK_ANCHOR_TOP_K), list(vectors))
+
+    roadmap_texts = app_main.roadmap_source_texts()
+    for lang in corpora:
+        if lang != "en":
+            record("translate_batch", lang, "roadmap", lambda texts: app_main.translate_batch(texts, "en", lang), [roadmap_texts])
+
+    queries = [app_main.yt_query_for_severity(s) for s in app_main.SEVERITIES]
+    record("youtube_search", "all", "uncached", lambda q: app_main.fetch_youtube(q, 8), queries)
+
+    for query in queries:
+        app_main.youtube_search(query, 8)  # fill the cache before timing hits
+    record("youtube_search", "all", "cached", lambda q: app_main.youtube_search(q, 8), queries)
+
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+
+    for key, current in sorted(results.items()):
+        previous = baseline.get("stages", {}).get(key)
+        if previous is None:
+            continue
+
+        limit = previous["p50_ms"] * (1 + tolerance)
+        if current["p50_ms"] > limit and current["p50_ms"] - previous["p50_ms"] > min_delta_ms:
+            regressions.append((key, previous["p50_ms"], current["p50_ms"]))
+
+    return regressions
+
+
+def environment():
+    import torch
+    from api import main as app_main
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "backend": app_main.INFERENCE_BACKEND,
+        "quantized": app_main.QUANTIZE_MODELS,
+        "models": [app_main.SENTIMENT_MODEL, app_main.EMBEDDING_MODEL, app_main.TRANSLATION_MODEL]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmark")
+    parser.add_argument("--languages", default="en,hi,ta")
+    parser.add_argument("--per-bucket", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--test-cases", default="TEST_CASES.md")
+    parser.add_argument("--requests", default="requests.jsonl")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore regressions smaller than this")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="also write this run's results here")
+    args = parser.parse_args()
+
+    with YouTubeStub(latency_ms=20) as stub:
+        # Read by api.main at import time
+        os.environ["YOUTUBE_API_BASE"] = stub.base_url
+        os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+        os.environ.setdefault("MICROBATCH_ENABLED", "0")
+
+        from api import main as app_main
+
+        english = bucketed(load_corpus(args.test_cases, args.requests), args.per_bucket)
+        corpora = {"en": english}
+
+        for lang in (l.strip() for l in args.languages.split(",")):
+            if lang and lang != "en":
+                corpora[lang] = {
+                    bucket: app_main.translate_batch(texts, "en", lang)
+                    for bucket, texts in english.items()
+                }
+
+        results = run_stages(app_main, corpora, args.repeats)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": environment(),
+        "stages": results
+    }
+
+    for key, stats in sorted(results.items()):
+        print(f"{key:45s} p50 {stats['p50_ms']:9.2f} ms   p95 {stats['p95_ms']:9.2f} ms   n={stats['n']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("Baseline written to", args.baseline)
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}:")
+        for key, before, after in regressions:
+            print(f"  {key}: {before:.2f} ms -> {after:.2f} ms")
+        sys.exit(1)
+
+    print("\nNo stage regressed beyond", f"{args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
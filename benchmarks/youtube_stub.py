@@ -0,0 +1,161 @@
+"""
+Local stand-in for the two YouTube Data API endpoints youtube_search
+calls (/search and /videos), with configurable latency and error rate.
+
+    python -m benchmarks.youtube_stub --port 8765 --latency-ms 120 --error-rate 0.02
+
+Then start the API with YOUTUBE_API_BASE=http://127.0.0.1:8765 and any
+YOUTUBE_API_KEY. Responses are deterministic per query, so runs are
+reproducible and never touch the network.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_video_ids(query, count):
+    return [
+        hashlib.sha256(f"{query}:{i}".encode("utf-8")).hexdigest()[:11]
+        for i in range(count)
+    ]
+
+
+def search_response(query, max_results):
+    return {
+        "kind": "youtube#searchListResponse",
+        "items": [
+            {"id": {"kind": "youtube#video", "videoId": video_id}}
+            for video_id in fake_video_ids(query, max_results)
+        ]
+    }
+
+
+def videos_response(ids):
+    return {
+        "kind": "youtube#videoListResponse",
+        "items": [
+            {
+                "id": video_id,
+                "snippet": {
+                    "title": f"Stub video {video_id}",
+                    "channelTitle": "Stub channel",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                    "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}}
+                },
+                "statistics": {"viewCount": str(1000 + i)}
+            }
+            for i, video_id in enumerate(ids)
+        ]
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # latency, error_rate, rng and counters live on the server (see YouTubeStub)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        server = self.server
+
+        with server.lock:
+            server.requests += 1
+            fail = server.rng.random() < server.error_rate
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if fail:
+            self.send_json(500, {"error": {"code": 500, "message": "stub error"}})
+            return
+
+        if url.path.endswith("/search"):
+            query = params.get("q", [""])[0]
+            max_results = int(params.get("maxResults", ["8"])[0])
+            self.send_json(200, search_response(query, max_results))
+        elif url.path.endswith("/videos"):
+            ids = params.get("id", [""])[0].split(",")
+            self.send_json(200, videos_response([i for i in ids if i]))
+        else:
+            self.send_json(404, {"error": {"code": 404, "message": "not found"}})
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class YouTubeStub:
+    """
+    Runs the stub on a background thread; usable as a context manager.
+    `base_url` is what YOUTUBE_API_BASE should point to.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, error_rate=0.0, seed=0):
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency_ms / 1000
+        self.server.error_rate = error_rate
+        self.server.rng = random.Random(seed)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local YouTube Data API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = YouTubeStub(args.host, args.port, args.latency_ms, args.error_rate, args.seed)
+    print(f"YouTube stub listening on {stub.base_url}")
+
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
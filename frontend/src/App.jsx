@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { Routes, Route, useNavigate, useLocation } from "react-router-dom";
 
 import "./App.css";
@@ -36,10 +36,15 @@ function Home() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
 
+  // Stream of the request in flight; a new one aborts it
+  const requestRef = useRef(null);
+
   const uiLang = UI_TEXT[language] ? language : "en";
   const t = UI_TEXT[uiLang];
 
   const handleLanguageChange = (e) => {
+    requestRef.current?.abort();
+    requestRef.current = null;
     setLanguage(e.target.value);
     setText("");
     setResults([]);
@@ -60,21 +65,62 @@ if (!cleaned || !hasLetters) {
   return;
 }
 
+    // Without this, the previous stream's roadmap / video events would
+    // keep merging into the new results
+    requestRef.current?.abort();
+    const controller = new AbortController();
+    requestRef.current = controller;
+
     setLoading(true);
 
     try {
-      const res = await fetch("http://127.0.0.1:8000/analyze", {
+      // Streamed as NDJSON: severity arrives first, then roadmap, then videos
+      const res = await fetch("http://127.0.0.1:8000/analyze-stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ text,language })
+        body: JSON.stringify({ text,language }),
+        signal: controller.signal
       });
 
-      const data = await res.json();
-      setResults([data]);
-    } catch {
-      setError("Unable to reach backend service.");
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let merged = {};
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+
+          const { event, ...payload } = JSON.parse(line);
+
+          if (event === "error") {
+            setError(payload.error);
+            continue;
+          }
+
+          merged = { ...merged, ...payload };
+          setResults([merged]);
+
+          // Show the severity result while roadmap and videos load
+          if (event === "analysis") setLoading(false);
+        }
+      }
+    } catch (err) {
+      if (err.name !== "AbortError") {
+        setError("Unable to reach backend service.");
+      }
     } finally {
-      setLoading(false);
+      if (requestRef.current === controller) {
+        requestRef.current = null;
+        setLoading(false);
+      }
     }
   };
 
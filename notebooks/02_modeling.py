@@ -1,17 +1,35 @@
+"""
+Sentiment model used by the API's cascade (models/sentiment_pipeline.joblib).
+
+    python notebooks/02_modeling.py
+    python notebooks/02_modeling.py --stream --input data/raw/*.tsv feedback.csv
+
+The default trains TF-IDF + LogisticRegression on the drugLib TSVs in
+memory. --stream trains out of core for corpora that do not fit: files
+are read in chunks, hashed into a fixed feature space and fed to an SGD
+logistic regression with partial_fit, so memory depends on --chunk-size
+and --n-features rather than on the number of rows. Both save a
+Pipeline with predict_proba and classes_ to the same path.
+"""
+
+import argparse
+import os
+import zlib
+
+import joblib
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.utils.class_weight import compute_class_weight
-import numpy as np
 
-# ----------------------------
-# Load preprocessed data
-# ----------------------------
+RAW_PATHS = ["data/raw/drugLibTrain_raw.tsv", "data/raw/drugLibTest_raw.tsv"]
+MODEL_PATH = "models/sentiment_pipeline.joblib"
+PREDICTIONS_PATH = "data/processed/test_predictions.csv"
 
-train_df = pd.read_csv("data/raw/drugLibTrain_raw.tsv", sep="\t")
-test_df = pd.read_csv("data/raw/drugLibTest_raw.tsv", sep="\t")
 
 def rating_to_sentiment(rating):
     if rating <= 4:
@@ -21,117 +39,299 @@ def rating_to_sentiment(rating):
     else:
         return "positive"
 
-train_df["sentiment"] = train_df["rating"].apply(rating_to_sentiment)
-test_df["sentiment"] = test_df["rating"].apply(rating_to_sentiment)
 
-full_df = pd.concat([train_df, test_df], ignore_index=True)
+def save_pipeline(pipeline):
+    os.makedirs("models", exist_ok=True)
+
+    joblib.dump(pipeline, MODEL_PATH)
+
+    print(f"\nModel saved to {MODEL_PATH}")
+
 
 # ----------------------------
-# Remove rows with missing text
+# In-memory training
 # ----------------------------
 
-full_df = full_df.dropna(subset=["benefitsReview"])
+def train_in_memory():
+    train_df = pd.read_csv(RAW_PATHS[0], sep="\t")
+    test_df = pd.read_csv(RAW_PATHS[1], sep="\t")
 
-# Combine multiple patient text fields
-full_df["combined_text"] = (
-    full_df["benefitsReview"].fillna("") + " " +
-    full_df["sideEffectsReview"].fillna("") + " " +
-    full_df["commentsReview"].fillna("")
-)
+    train_df["sentiment"] = train_df["rating"].apply(rating_to_sentiment)
+    test_df["sentiment"] = test_df["rating"].apply(rating_to_sentiment)
 
-X = full_df["combined_text"]
+    full_df = pd.concat([train_df, test_df], ignore_index=True)
 
-y = full_df["sentiment"]
+    # Remove rows with missing text
+    full_df = full_df.dropna(subset=["benefitsReview"])
 
-print("After removing NaNs, dataset size:", full_df.shape)
+    # Combine multiple patient text fields
+    full_df["combined_text"] = (
+        full_df["benefitsReview"].fillna("") + " " +
+        full_df["sideEffectsReview"].fillna("") + " " +
+        full_df["commentsReview"].fillna("")
+    )
 
+    X = full_df["combined_text"]
 
-from sklearn.model_selection import train_test_split
+    y = full_df["sentiment"]
 
-X_train, X_temp, y_train, y_temp = train_test_split(
-    X, y,
-    test_size=0.30,
-    stratify=y,
-    random_state=42
-)
+    print("After removing NaNs, dataset size:", full_df.shape)
 
-X_val, X_test, y_val, y_test = train_test_split(
-    X_temp, y_temp,
-    test_size=0.50,
-    stratify=y_temp,
-    random_state=42
-)
+    X_train, X_temp, y_train, y_temp = train_test_split(
+        X, y,
+        test_size=0.30,
+        stratify=y,
+        random_state=42
+    )
 
-# ----------------------------
-# Class weights (imbalance handling)
-# ----------------------------
+    X_val, X_test, y_val, y_test = train_test_split(
+        X_temp, y_temp,
+        test_size=0.50,
+        stratify=y_temp,
+        random_state=42
+    )
 
-classes = np.unique(y_train)
-weights = compute_class_weight(
-    class_weight="balanced",
-    classes=classes,
-    y=y_train
-)
-class_weights = dict(zip(classes, weights))
+    # Class weights (imbalance handling)
+    classes = np.unique(y_train)
+    weights = compute_class_weight(
+        class_weight="balanced",
+        classes=classes,
+        y=y_train
+    )
+    class_weights = dict(zip(classes, weights))
 
-print("Class weights:", class_weights)
+    print("Class weights:", class_weights)
 
-# ----------------------------
-# TF-IDF + Logistic Regression
-# ----------------------------
+    # TF-IDF + Logistic Regression
+    pipeline = Pipeline([
+        ("tfidf", TfidfVectorizer(
+            max_features=20000,
+            ngram_range=(1, 2),
+            stop_words="english",
+            min_df=5
+        )),
+        ("clf", LogisticRegression(
+            max_iter=1000,
+            class_weight=class_weights,
+            n_jobs=-1
+        ))
+    ])
 
-pipeline = Pipeline([
-    ("tfidf", TfidfVectorizer(
-        max_features=20000,
-        ngram_range=(1, 2),
-        stop_words="english",
-        min_df=5
-    )),
-    ("clf", LogisticRegression(
-        max_iter=1000,
-        class_weight=class_weights,
-        n_jobs=-1
-    ))
-])
+    pipeline.fit(X_train, y_train)
 
-# ----------------------------
-# Train model
-# ----------------------------
+    # Evaluation on test set
+    y_pred = pipeline.predict(X_test)
 
-pipeline.fit(X_train, y_train)
+    print("\nCLASSIFICATION REPORT (TEST SET):")
+    print(classification_report(y_test, y_pred))
 
-# ----------------------------
-# Evaluation on test set
-# ----------------------------
+    print("\nCONFUSION MATRIX:")
+    print(confusion_matrix(y_test, y_pred))
 
-y_pred = pipeline.predict(X_test)
+    save_pipeline(pipeline)
 
-print("\nCLASSIFICATION REPORT (TEST SET):")
-print(classification_report(y_test, y_pred))
+    # Save predictions for analysis
+    results_df = pd.DataFrame({
+        "text": X_test,
+        "true_label": y_test,
+        "predicted_label": y_pred
+    })
 
-print("\nCONFUSION MATRIX:")
-print(confusion_matrix(y_test, y_pred))
+    results_df.to_csv(PREDICTIONS_PATH, index=False)
+    print("Saved test predictions for error analysis.")
 
-import joblib
-import os
 
 # ----------------------------
-# Save trained model pipeline
+# Streaming (out-of-core) training
 # ----------------------------
-os.makedirs("models", exist_ok=True)
-
-joblib.dump(pipeline, "models/sentiment_pipeline.joblib")
-
-print("\nModel saved to models/sentiment_pipeline.joblib")
 
-import pandas as pd
+def read_chunks(paths, chunk_size):
+    """
+    Yields (text, sentiment) DataFrames from drugLib-style files (rating
+    + review columns) or labelled feedback files (text, sentiment).
+    """
+    for path in paths:
+        sep = "\t" if path.endswith(".tsv") else ","
+
+        for chunk in pd.read_csv(path, sep=sep, chunksize=chunk_size):
+            if "benefitsReview" in chunk.columns:
+                chunk = chunk.dropna(subset=["benefitsReview", "rating"])
+                text = (
+                    chunk["benefitsReview"].fillna("") + " " +
+                    chunk["sideEffectsReview"].fillna("") + " " +
+                    chunk["commentsReview"].fillna("")
+                )
+                sentiment = chunk["rating"].apply(rating_to_sentiment)
+            else:
+                chunk = chunk.dropna(subset=["text", "sentiment"])
+                text = chunk["text"].astype(str)
+                sentiment = chunk["sentiment"].astype(str)
+
+            yield pd.DataFrame({"text": text.values, "sentiment": sentiment.values})
+
+
+def split_of(text):
+    """
+    70 / 15 / 15 train / val / test by a hash of the text. Stable across
+    passes and runs without holding an index, and duplicates always land
+    in the same split.
+    """
+    bucket = zlib.crc32(text.encode("utf-8")) % 100
+    if bucket < 70:
+        return "train"
+    elif bucket < 85:
+        return "val"
+    return "test"
+
+
+def split_chunks(paths, chunk_size, split):
+    for chunk in read_chunks(paths, chunk_size):
+        chunk = chunk[chunk["text"].map(split_of) == split]
+        if len(chunk):
+            yield chunk
+
+
+def print_report(matrix, classes):
+    """classification_report from an accumulated confusion matrix."""
+    print(f"{'':>12} {'precision':>10} {'recall':>10} {'f1-score':>10} {'support':>10}")
+
+    for i, label in enumerate(classes):
+        predicted = matrix[:, i].sum()
+        support = matrix[i].sum()
+        precision = matrix[i, i] / predicted if predicted else 0.0
+        recall = matrix[i, i] / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        print(f"{label:>12} {precision:>10.2f} {recall:>10.2f} {f1:>10.2f} {support:>10}")
+
+    total = matrix.sum()
+    accuracy = np.trace(matrix) / total if total else 0.0
+    print(f"\n{'accuracy':>12} {'':>10} {'':>10} {accuracy:>10.2f} {total:>10}")
+
+
+def train_streaming(args):
+    hashing = HashingVectorizer(
+        n_features=args.n_features,
+        ngram_range=(1, 2),
+        stop_words="english",
+        alternate_sign=False,
+        norm=None
+    )
+
+    # Pass 1: label counts and document frequencies over the train split.
+    # Both are fixed-size, so this is the only global state kept.
+    label_counts = {}
+    document_frequency = np.zeros(args.n_features, dtype=np.int64)
+    n_documents = 0
+
+    for chunk in split_chunks(args.input, args.chunk_size, "train"):
+        for label, count in chunk["sentiment"].value_counts().items():
+            label_counts[label] = label_counts.get(label, 0) + int(count)
+
+        counts = hashing.transform(chunk["text"])
+        document_frequency += np.bincount(counts.indices, minlength=args.n_features)
+        n_documents += counts.shape[0]
+
+    if not n_documents:
+        raise ValueError("No training rows found in " + ", ".join(args.input))
+
+    classes = np.array(sorted(label_counts))
+
+    # Same formula as compute_class_weight("balanced")
+    class_weights = {
+        label: n_documents / (len(classes) * count)
+        for label, count in label_counts.items()
+    }
+
+    print("Training rows:", n_documents)
+    print("Class weights:", class_weights)
+
+    # Same smoothed idf as TfidfVectorizer, without a vocabulary
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    tfidf.n_features_in_ = args.n_features
+
+    features = Pipeline([("hashing", hashing), ("tfidf", tfidf)])
+
+    clf = SGDClassifier(
+        loss="log_loss",
+        alpha=args.alpha,
+        random_state=42
+    )
+
+    # Passes 2..: partial_fit chunk by chunk, shuffled within each chunk
+    rng = np.random.default_rng(42)
+
+    for epoch in range(args.epochs):
+        for chunk in split_chunks(args.input, args.chunk_size, "train"):
+            chunk = chunk.iloc[rng.permutation(len(chunk))]
+            labels = chunk["sentiment"].values
+            clf.partial_fit(
+                features.transform(chunk["text"]),
+                labels,
+                classes=classes,
+                sample_weight=np.array([class_weights[label] for label in labels])
+            )
+
+        correct = total = 0
+        for chunk in split_chunks(args.input, args.chunk_size, "val"):
+            correct += int((clf.predict(features.transform(chunk["text"])) == chunk["sentiment"].values).sum())
+            total += len(chunk)
+
+        print(f"Epoch {epoch + 1}/{args.epochs}: val accuracy {correct / total:.3f}" if total else f"Epoch {epoch + 1}/{args.epochs}")
+
+    pipeline = Pipeline([
+        ("hashing", hashing),
+        ("tfidf", tfidf),
+        ("clf", clf)
+    ])
+
+    # Evaluation on test set: the confusion matrix accumulates per chunk
+    # and predictions are appended to the CSV instead of held in memory
+    matrix = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    index = {label: i for i, label in enumerate(classes)}
+
+    os.makedirs(os.path.dirname(PREDICTIONS_PATH), exist_ok=True)
+    header = True
+
+    for chunk in split_chunks(args.input, args.chunk_size, "test"):
+        y_pred = pipeline.predict(chunk["text"])
+
+        for true, predicted in zip(chunk["sentiment"].values, y_pred):
+            if true in index:
+                matrix[index[true], index[predicted]] += 1
+
+        pd.DataFrame({
+            "text": chunk["text"].values,
+            "true_label": chunk["sentiment"].values,
+            "predicted_label": y_pred
+        }).to_csv(PREDICTIONS_PATH, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+    print("\nCLASSIFICATION REPORT (TEST SET):")
+    print_report(matrix, classes)
+
+    print("\nCONFUSION MATRIX:")
+    print(matrix)
+
+    save_pipeline(pipeline)
+    print("Saved test predictions for error analysis.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the cascade sentiment model")
+    parser.add_argument("--stream", action="store_true", help="out-of-core training with hashed features and partial_fit")
+    parser.add_argument("--input", nargs="+", default=RAW_PATHS, help="TSV/CSV files for --stream")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows read per chunk with --stream")
+    parser.add_argument("--n-features", type=int, default=2 ** 20, help="hashed feature space with --stream")
+    parser.add_argument("--epochs", type=int, default=5, help="passes over the train split with --stream")
+    parser.add_argument("--alpha", type=float, default=1e-5, help="SGD regularization with --stream")
+    args = parser.parse_args()
+
+    if args.stream:
+        train_streaming(args)
+    else:
+        train_in_memory()
 
-# Save predictions for analysis
-results_df = pd.DataFrame({
-    "text": X_test,
-    "true_label": y_test,
-    "predicted_label": y_pred
-})
 
-results_df.to_csv("data/processed/test_predictions.csv", index=False)
-print("Saved test predictions for error analysis.")
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,61 @@
-import pandas as pd
+import argparse
 from pathlib import Path
 
+import pandas as pd
+
+from sampling import SampleManifest, build_grid, write_manifest
+
 INPUT_PATH = "data/processed/binary_sentiment_clean.csv"
 OUTPUT_DIR = "data/processed/imbalanced"
 
-def create_imbalanced_dataset(
-    target_ratio,
+
+def create_imbalanced_datasets(
+    target_ratios,
+    seeds=(42,),
     minority_label="negative",
     label_col="binary_sentiment",
-    random_state=42
+    export_csv=False,
+    input_path=INPUT_PATH,
+    output_dir=OUTPUT_DIR
 ):
-    df = pd.read_csv(INPUT_PATH)
+    # Load the source once for the whole grid
+    df = pd.read_csv(input_path)
 
-    majority = df[df[label_col] != minority_label]
-    minority = df[df[label_col] == minority_label]
+    samples = build_grid(df[label_col], target_ratios, seeds, minority_label)
+    write_manifest(output_dir, input_path, samples, label_col, minority_label)
 
-    n_minority = len(majority) // target_ratio
-    minority_sampled = minority.sample(
-        n=min(n_minority, len(minority)),
-        random_state=random_state
-    )
+    print(f"\nSaved {len(samples)} sample manifests to: {output_dir}")
 
-    df_imbalanced = (
-        pd.concat([majority, minority_sampled])
-        .sample(frac=1, random_state=random_state)
-        .reset_index(drop=True)
-    )
+    manifest = SampleManifest(output_dir, source=df)
 
-    OUTPUT_DIR_PATH = Path(OUTPUT_DIR)
-    OUTPUT_DIR_PATH.mkdir(parents=True, exist_ok=True)
+    for name in manifest.samples:
+        view = manifest.view(name)
+        counts = view.value_counts(label_col)
 
-    output_path = OUTPUT_DIR_PATH / f"binary_sentiment_{target_ratio}to1.csv"
-    df_imbalanced.to_csv(output_path, index=False)
+        print(f"\n{name}: {len(view)} rows")
+        print("Class distribution:")
+        print(counts)
+        print(counts / len(view))
 
-    print(f"\nSaved: {output_path}")
-    print("Class distribution:")
-    print(df_imbalanced[label_col].value_counts())
-    print(df_imbalanced[label_col].value_counts(normalize=True))
+        if export_csv:
+            output_path = Path(output_dir) / f"binary_sentiment_{name}.csv"
+            view.to_frame().to_csv(output_path, index=False)
+            print(f"Saved: {output_path}")
 
 
 if __name__ == "__main__":
-    create_imbalanced_dataset(10)
-    create_imbalanced_dataset(19)
-    create_imbalanced_dataset(49)
+    parser = argparse.ArgumentParser(description="Draw imbalanced samples as row-index manifests")
+    parser.add_argument("--ratios", type=int, nargs="+", default=[10, 19, 49], help="majority:minority ratios")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[42])
+    parser.add_argument("--export-csv", action="store_true", help="also write each sample as a CSV copy")
+    parser.add_argument("--input", default=INPUT_PATH, help="source CSV to sample rows from")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    create_imbalanced_datasets(
+        args.ratios,
+        args.seeds,
+        export_csv=args.export_csv,
+        input_path=args.input,
+        output_dir=args.output_dir
+    )
@@ -1,7 +1,18 @@
+import argparse
+
 import pandas as pd
 
+from near_duplicates import deduplicate
+
 INPUT_PATH = "data/processed/binary_sentiment.csv"
 OUTPUT_PATH = "data/processed/binary_sentiment_clean.csv"
+REPORT_PATH = "data/processed/dedup_report.csv"
+
+parser = argparse.ArgumentParser(description="Remove exact and near-duplicate reviews")
+parser.add_argument("--threshold", type=float, default=0.8, help="estimated Jaccard similarity of character shingles")
+parser.add_argument("--num-perm", type=int, default=128)
+parser.add_argument("--shingle-size", type=int, default=5)
+args = parser.parse_args()
 
 df = pd.read_csv(INPUT_PATH)
 
@@ -9,15 +20,27 @@ print("Before deduplication:", len(df))
 print("Class distribution before:")
 print(df["binary_sentiment"].value_counts())
 
-df_clean = df.drop_duplicates(
-    subset=["benefitsReview"], 
-    keep="first"
-).reset_index(drop=True)
+df_clean, report = deduplicate(
+    df,
+    "benefitsReview",
+    label_col="binary_sentiment",
+    threshold=args.threshold,
+    num_perm=args.num_perm,
+    shingle_size=args.shingle_size
+)
+df_clean = df_clean.reset_index(drop=True)
+
+exact = (report["text"] == report["kept_text"]).sum()
 
 print("\nAfter deduplication:", len(df_clean))
 print("Removed duplicates:", len(df) - len(df_clean))
+print(f"  exact: {exact}, near (threshold {args.threshold}): {len(report) - exact}")
+print("  with a different label than the kept row:", (report["label"] != report["kept_label"]).sum())
 print("\nClass distribution after:")
 print(df_clean["binary_sentiment"].value_counts())
 
 df_clean.to_csv(OUTPUT_PATH, index=False)
 print(f"\nSaved cleaned dataset to: {OUTPUT_PATH}")
+
+report.to_csv(REPORT_PATH, index=False)
+print(f"Saved removed rows to: {REPORT_PATH}")
@@ -0,0 +1,375 @@
+"""
+Data preparation and training as a stage graph.
+
+    python notebooks/pipeline.py                 # everything
+    python notebooks/pipeline.py imbalanced      # one stage and what it needs
+    python notebooks/pipeline.py --dry-run       # show what would run
+
+Each stage is a notebook script with declared input and output files.
+A stage's key hashes its script (plus any helper code it imports), its
+arguments and the contents of its inputs; outputs and the script's log
+are stored under .pipeline_cache/<stage>/<key>. A stage whose key is
+unchanged is skipped, and one whose key was seen before is restored from
+the cache instead of re-run. Stages run as soon as their inputs have
+been produced, independent ones in parallel.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT, ".pipeline_cache")
+
+# Hashes of large inputs are reused while size and mtime are unchanged
+STAT_CACHE_PATH = os.path.join(CACHE_DIR, "file_hashes.json")
+
+# Cached results kept per stage
+KEEP_VERSIONS = 3
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    deps: list
+    outs: list
+    args: list = field(default_factory=list)
+    code: list = field(default_factory=list)
+
+
+STAGES = [
+    Stage(
+        "binary",
+        "notebooks/06_binary_dataset.py",
+        deps=["data/raw/drugLibTrain_raw.tsv"],
+        outs=["data/processed/binary_sentiment.csv"]
+    ),
+    Stage(
+        "validate",
+        "notebooks/08_validate_dataset.py",
+        deps=["data/processed/binary_sentiment.csv"],
+        outs=[]
+    ),
+    Stage(
+        "dedup",
+        "notebooks/08_deduplicate_dataset.py",
+        deps=["data/processed/binary_sentiment.csv"],
+        outs=["data/processed/binary_sentiment_clean.csv", "data/processed/dedup_report.csv"],
+        args=["--threshold", "0.8"],
+        code=["notebooks/near_duplicates.py"]
+    ),
+    Stage(
+        "inspect",
+        "notebooks/09_clean_data.py",
+        deps=["data/processed/binary_sentiment_clean.csv"],
+        outs=[]
+    ),
+    Stage(
+        "imbalanced",
+        "notebooks/07_create_imbalanced_dataset.py",
+        deps=["data/processed/binary_sentiment_clean.csv"],
+        outs=[
+            "data/processed/imbalanced/manifest.json",
+            "data/processed/imbalanced/indices.npy"
+        ],
+        args=["--ratios", "10", "19", "49", "--seeds", "42"],
+        code=["notebooks/sampling.py"]
+    ),
+    Stage(
+        "modeling",
+        "notebooks/02_modeling.py",
+        deps=["data/raw/drugLibTrain_raw.tsv", "data/raw/drugLibTest_raw.tsv"],
+        outs=["models/sentiment_pipeline.joblib", "data/processed/test_predictions.csv"]
+    ),
+]
+
+
+class FileHasher:
+    """sha256 of files, memoized on (size, mtime) across runs."""
+
+    def __init__(self, path=STAT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def hash(self, relpath):
+        full = os.path.join(ROOT, relpath)
+        stat = os.stat(full)
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        with self.lock:
+            entry = self.entries.get(relpath)
+            if entry and entry["stat"] == signature:
+                return entry["sha256"]
+
+        digest = hashlib.sha256()
+        with open(full, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+        with self.lock:
+            self.entries[relpath] = {"stat": signature, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+
+
+def stage_key(stage, hasher):
+    """Hash of everything that determines the stage's outputs."""
+    parts = {
+        "script": hasher.hash(stage.script),
+        "code": {path: hasher.hash(path) for path in stage.code},
+        "args": stage.args,
+        "deps": {path: hasher.hash(path) for path in stage.deps},
+        "outs": stage.outs
+    }
+    payload = json.dumps(parts, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def build_graph(stages):
+    """Upstream stage names for each stage, from matching outs to deps."""
+    producers = {}
+    for stage in stages:
+        for out in stage.outs:
+            if out in producers:
+                raise ValueError(f"{out} is produced by both {producers[out]} and {stage.name}")
+            producers[out] = stage.name
+
+    return {
+        stage.name: sorted({producers[dep] for dep in stage.deps if dep in producers})
+        for stage in stages
+    }
+
+
+def select(stages, graph, targets):
+    """The target stages plus everything upstream of them, in declaration order."""
+    if not targets:
+        return stages
+
+    names = {stage.name for stage in stages}
+    unknown = [t for t in targets if t not in names]
+    if unknown:
+        raise ValueError("Unknown stages: " + ", ".join(unknown))
+
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(graph[name])
+
+    return [stage for stage in stages if stage.name in needed]
+
+
+class StageCache:
+    """Outputs and logs of past runs, one directory per (stage, key)."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def entry(self, stage, key):
+        return os.path.join(self.root, stage.name, key)
+
+    def has(self, stage, key):
+        return os.path.exists(os.path.join(self.entry(stage, key), "meta.json"))
+
+    def outputs_current(self, stage, key, hasher):
+        """True when the working tree already holds this key's outputs."""
+        with open(os.path.join(self.entry(stage, key), "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        for out in stage.outs:
+            if not os.path.exists(os.path.join(ROOT, out)):
+                return False
+            if hasher.hash(out) != meta["outs"].get(out):
+                return False
+        return True
+
+    def restore(self, stage, key):
+        # Restoring counts as use for pruning
+        os.utime(self.entry(stage, key))
+        for out in stage.outs:
+            target = os.path.join(ROOT, out)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(os.path.join(self.entry(stage, key), "outs", out), target)
+
+    def store(self, stage, key, log, seconds, hasher):
+        entry = self.entry(stage, key)
+        tmp = entry + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        for out in stage.outs:
+            target = os.path.join(tmp, "outs", out)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(ROOT, out), target)
+
+        with open(os.path.join(tmp, "log.txt"), "w", encoding="utf-8") as f:
+            f.write(log)
+
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "stage": stage.name,
+                "key": key,
+                "seconds": round(seconds, 2),
+                "created_at": time.time(),
+                "outs": {out: hasher.hash(out) for out in stage.outs}
+            }, f, indent=2)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.prune(stage)
+
+    def log(self, stage, key):
+        with open(os.path.join(self.entry(stage, key), "log.txt"), encoding="utf-8") as f:
+            return f.read()
+
+    def prune(self, stage, keep=KEEP_VERSIONS):
+        directory = os.path.join(self.root, stage.name)
+        entries = [
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if os.path.exists(os.path.join(directory, name, "meta.json"))
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for old in entries[keep:]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def run_script(stage):
+    start = time.time()
+    completed = subprocess.run(
+        [sys.executable, stage.script, *stage.args],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    return completed.returncode, completed.stdout, time.time() - start
+
+
+def execute(stage, cache, hasher, force=False, dry_run=False):
+    """Runs, restores or skips one stage. Returns (status, log)."""
+    key = stage_key(stage, hasher)
+
+    if not force and cache.has(stage, key):
+        if cache.outputs_current(stage, key, hasher):
+            return "skipped", ""
+        if dry_run:
+            return "would restore", ""
+        cache.restore(stage, key)
+        return "restored", ""
+
+    if dry_run:
+        return "would run", ""
+
+    returncode, log, seconds = run_script(stage)
+    if returncode != 0:
+        return "failed", log
+
+    missing = [out for out in stage.outs if not os.path.exists(os.path.join(ROOT, out))]
+    if missing:
+        return "failed", log + "\nMissing outputs: " + ", ".join(missing)
+
+    cache.store(stage, key, log, seconds, hasher)
+    return f"ran in {seconds:.1f}s", log
+
+
+def run_pipeline(stages, jobs=None, force=False, dry_run=False, verbose=False):
+    graph = build_graph(STAGES)
+    selected = {stage.name: stage for stage in stages}
+    upstream = {name: [u for u in graph[name] if u in selected] for name in selected}
+
+    cache = StageCache()
+    hasher = FileHasher()
+
+    statuses = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while len(statuses) < len(selected):
+            for name, stage in selected.items():
+                if name in statuses or name in running.values():
+                    continue
+
+                before = [statuses.get(u) for u in upstream[name]]
+
+                if "failed" in before or "not run" in before:
+                    statuses[name] = "not run"
+                    print(f"[{name}] not run: upstream failed")
+                elif any(s and s.startswith("would") for s in before):
+                    # Inputs do not exist yet, so the key cannot be known
+                    statuses[name] = "would run"
+                    print(f"[{name}] would run")
+                elif None not in before:
+                    future = pool.submit(execute, stage, cache, hasher, force, dry_run)
+                    running[future] = name
+
+            if not running:
+                if len(statuses) < len(selected):
+                    raise ValueError("Stage graph has a cycle")
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    status, log = future.result()
+                except Exception as exc:
+                    status, log = "failed", repr(exc)
+
+                print(f"[{name}] {status}")
+                if log and (verbose or status == "failed"):
+                    print(log.rstrip())
+
+                statuses[name] = "failed" if status == "failed" else status
+
+    hasher.save()
+    return all(status not in ("failed", "not run") for status in statuses.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data preparation and training stages")
+    parser.add_argument("stages", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--jobs", type=int, default=None, help="stages run in parallel (default: cores)")
+    parser.add_argument("--force", action="store_true", help="re-run the selected stages even when cached")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="print each stage's output")
+    parser.add_argument("--list", action="store_true", help="print the graph and exit")
+    args = parser.parse_args()
+
+    graph = build_graph(STAGES)
+
+    if args.list:
+        for stage in STAGES:
+            after = ", ".join(graph[stage.name]) or "-"
+            print(f"{stage.name:<12} {stage.script:<44} after: {after}")
+        return
+
+    stages = select(STAGES, graph, args.stages)
+
+    if not run_pipeline(stages, args.jobs, args.force, args.dry_run, args.verbose):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Imbalanced samples stored as row-index manifests over one source file.
+
+A grid of (ratio, seed) samples is drawn in one pass over the loaded
+source and saved as a single int32 array (indices.npy) plus
+manifest.json, which records each sample's slice of that array and the
+source file's hash. Reading a sample memory-maps the array, so the
+indices are a view into the file; rows are only gathered from the
+source, which is loaded once for all samples, when asked for.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+INDICES_NAME = "indices.npy"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sample_name(ratio, seed):
+    return f"{ratio}to1_seed{seed}"
+
+
+def build_grid(labels, ratios, seeds, minority_label="negative"):
+    """
+    Row indices for every (ratio, seed): all majority rows plus
+    len(majority) // ratio minority rows, shuffled.
+
+    The draws are the ones the earlier per-ratio CSV script made with
+    DataFrame.sample(random_state=seed) (a fresh RandomState for the
+    minority sample and again for the shuffle), so a seed selects the
+    same rows in the same order as the CSVs it used to write. For a
+    given seed the minority rows are one permutation cut at different
+    lengths, so lower ratios contain the higher ones' rows.
+    """
+    labels = np.asarray(labels)
+    minority = np.flatnonzero(labels == minority_label)
+    majority = np.flatnonzero(labels != minority_label)
+
+    samples = {}
+    for seed in seeds:
+        order = minority[np.random.RandomState(seed).permutation(len(minority))]
+
+        for ratio in ratios:
+            chosen = order[:min(len(majority) // ratio, len(minority))]
+            rows = np.concatenate([majority, chosen])
+            shuffle = np.random.RandomState(seed).permutation(len(rows))
+            samples[sample_name(ratio, seed)] = {
+                "ratio": ratio,
+                "seed": seed,
+                "indices": rows[shuffle].astype(np.int32)
+            }
+
+    return samples
+
+
+def write_manifest(directory, source_path, samples, label_col, minority_label):
+    os.makedirs(directory, exist_ok=True)
+
+    entries = {}
+    offset = 0
+    for name, sample in samples.items():
+        count = len(sample["indices"])
+        entries[name] = {
+            "ratio": sample["ratio"],
+            "seed": sample["seed"],
+            "offset": offset,
+            "rows": count
+        }
+        offset += count
+
+    indices = (
+        np.concatenate([s["indices"] for s in samples.values()])
+        if samples else np.empty(0, dtype=np.int32)
+    )
+    np.save(os.path.join(directory, INDICES_NAME), indices)
+
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({
+            "source": source_path,
+            "source_sha256": file_sha256(source_path),
+            "label_col": label_col,
+            "minority_label": minority_label,
+            "samples": entries
+        }, f, indent=2)
+
+
+class SampleView:
+    """Rows of the shared source selected by a memory-mapped index slice."""
+
+    def __init__(self, source, indices, name):
+        self.source = source
+        self.indices = indices
+        self.name = name
+
+    def __len__(self):
+        return len(self.indices)
+
+    def column(self, name):
+        return self.source[name].to_numpy()[self.indices]
+
+    def value_counts(self, column):
+        return pd.Series(self.column(column)).value_counts()
+
+    def iter_batches(self, batch_size=1024):
+        """DataFrame batches, so only one batch of rows is copied at a time."""
+        for start in range(0, len(self.indices), batch_size):
+            yield self.source.iloc[self.indices[start:start + batch_size]]
+
+    def to_frame(self):
+        return self.source.iloc[self.indices].reset_index(drop=True)
+
+
+class SampleManifest:
+    """
+    Reads a manifest written by write_manifest.
+
+        manifest = SampleManifest("data/processed/imbalanced")
+        view = manifest.view("19to1_seed42")
+    """
+
+    def __init__(self, directory, source=None):
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.samples = self.meta["samples"]
+        self.indices = np.load(os.path.join(directory, INDICES_NAME), mmap_mode="r")
+        self._source = source
+
+    @property
+    def source(self):
+        if self._source is None:
+            path = self.meta["source"]
+            if file_sha256(path) != self.meta["source_sha256"]:
+                raise ValueError(f"{path} changed since the manifest was written; rebuild the samples")
+            self._source = pd.read_csv(path)
+        return self._source
+
+    def view(self, name):
+        if name not in self.samples:
+            raise KeyError(f"Unknown sample {name!r}; available: {', '.join(self.samples)}")
+        entry = self.samples[name]
+        indices = self.indices[entry["offset"]:entry["offset"] + entry["rows"]]
+        return SampleView(self.source, indices, name)
@@ -0,0 +1,5 @@
+import os
+
+# Importing api.main must not start loading models
+os.environ.setdefault("PRELOAD_MODELS", "")
+os.environ.setdefault("RESULT_CACHE_PATH", "")
@@ -0,0 +1,43 @@
+import numpy as np
+
+from api.anchor_index import AnchorIndex
+
+
+def index_for(matrix, categories, thresholds, **kwargs):
+    anchors = [{"text": f"a{i}", "category": c, "language": "en"} for i, c in enumerate(categories)]
+    return AnchorIndex(anchors, np.asarray(matrix, dtype=np.float32), thresholds=thresholds, **kwargs)
+
+
+def test_threshold_uses_the_raw_score():
+    # cos = 0.68004, which rounds to the 0.68 threshold
+    score = 0.68004
+    index = index_for([[score, np.sqrt(1 - score ** 2)]], ["self_harm"], {"self_harm": 0.68})
+
+    result = index.search(np.array([[1.0, 0.0]]))[0]
+
+    assert result["trigger"]["category"] == "self_harm"
+    assert result["trigger"]["score"] == 0.68
+
+
+def test_threshold_is_checked_beyond_the_top_k():
+    # Five close anchors with a high threshold outrank one with a low one
+    matrix = [[0.9, np.sqrt(1 - 0.81)]] * 5 + [[0.5, np.sqrt(1 - 0.25)]]
+    categories = ["hopeless"] * 5 + ["plan"]
+    index = index_for(matrix, categories, {"hopeless": 0.95, "plan": 0.4})
+
+    result = index.search(np.array([[1.0, 0.0]]), k=5)[0]
+
+    assert [m["category"] for m in result["matches"]] == ["hopeless"] * 5
+    assert result["trigger"]["category"] == "plan"
+
+
+def test_blocked_scores_match_dense_scores():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(50, 8)).astype(np.float16)
+    queries = rng.normal(size=(3, 8))
+
+    dense = index_for(matrix, ["c"] * 50, {}, block_rows=64)
+    blocked = index_for(matrix, ["c"] * 50, {}, block_rows=7)
+
+    assert blocked.dense is None
+    np.testing.assert_allclose(blocked.scores(queries), dense.scores(queries), rtol=1e-6)
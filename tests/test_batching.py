@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from api.batching import MicroBatcher
+
+
+def test_cancelled_caller_does_not_kill_worker():
+    release = threading.Event()
+
+    def batch_fn(items):
+        release.wait(1)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+
+    # Occupy the worker, then cancel a request still waiting in the queue
+    busy = batcher.submit(1)
+    cancelled = batcher.submit(2)
+    assert cancelled.cancel()
+    release.set()
+
+    assert busy.result(timeout=2) == 2
+    assert batcher.submit(3).result(timeout=2) == 6
+    assert batcher._worker.is_alive()
+
+
+def test_cancel_after_dequeue_is_ignored():
+    started = threading.Event()
+    release = threading.Event()
+
+    def batch_fn(items):
+        started.set()
+        release.wait(1)
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit("a")
+    started.wait(1)
+
+    # Running futures cannot be cancelled, so the result still lands
+    assert not future.cancel()
+    release.set()
+    assert future.result(timeout=2) == "a"
+    assert batcher.submit("b").result(timeout=2) == "b"
+
+
+def test_bad_input_only_fails_its_own_caller():
+    def batch_fn(items):
+        if "bad" in items:
+            raise ValueError("bad input")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+    futures = {item: batcher.submit(item) for item in ["a", "bad", "b"]}
+
+    assert futures["a"].result(timeout=2) == "A"
+    assert futures["b"].result(timeout=2) == "B"
+    with pytest.raises(ValueError):
+        futures["bad"].result(timeout=2)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_worker_is_restarted():
+    def batch_fn(items):
+        if "exit" in items:
+            raise SystemExit  # not caught by the worker loop
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_wait_ms=1)
+    batcher.submit("exit")
+    batcher._worker.join(2)
+    assert not batcher._worker.is_alive()
+
+    assert batcher.submit("b").result(timeout=2) == "b"
@@ -0,0 +1,18 @@
+from api.language import ScriptLanguageDetector
+
+detector = ScriptLanguageDetector({"en": "eng_Latn", "hi": "hin_Deva", "mr": "mar_Deva", "ta": "tam_Taml"})
+
+
+def test_unsupported_latin_language_gets_low_confidence():
+    lang, confidence = detector.detect("Je suis fatigué et triste")
+
+    assert lang == "en"
+    assert confidence < 0.5
+
+
+def test_english_keeps_high_confidence():
+    assert detector.detect("I feel tired and hopeless today")[1] > 0.9
+
+
+def test_single_language_script_is_decided_by_the_script():
+    assert detector.detect("நான் சோர்வாக இருக்கிறேன்") == ("ta", 1.0)
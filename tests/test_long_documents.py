@@ -0,0 +1,21 @@
+from api.main import split_segments
+
+
+def test_run_on_sentence_is_split_at_words():
+    text = "and then it went on " * 200
+    segments = split_segments(text, max_chars=300)
+
+    assert len(segments) > 1
+    assert max(len(s) for s in segments) <= 300
+    assert " ".join(segments).split() == text.split()
+
+
+def test_word_longer_than_limit_is_sliced():
+    segments = split_segments("x" * 700 + " tail.", max_chars=300)
+
+    assert max(len(s) for s in segments) <= 300
+    assert "".join(segments).replace(" ", "") == "x" * 700 + "tail."
+
+
+def test_short_sentences_are_kept_whole():
+    assert split_segments("I feel fine. Really, I do!") == ["I feel fine.", "Really, I do!"]
@@ -0,0 +1,57 @@
+import sqlite3
+
+from api.lru_cache import LRUCache
+
+
+def stored_keys(path):
+    with sqlite3.connect(path) as db:
+        return {row[0] for row in db.execute("SELECT key FROM entries")}
+
+
+def test_store_is_cleared_when_version_changes(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+
+    LRUCache(persist_path=path, version="v1", flush_every=1).put("hi|en|namaste", "hello")
+    assert LRUCache(persist_path=path, version="v1").get("hi|en|namaste") == "hello"
+
+    assert LRUCache(persist_path=path, version="v2").get("hi|en|namaste") is None
+    assert LRUCache(persist_path=path, version="v1").get("hi|en|namaste") is None
+
+
+def test_unversioned_store_is_kept(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+
+    LRUCache(persist_path=path, flush_every=1).put("k", "v")
+    assert LRUCache(persist_path=path).get("k") == "v"
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+    cache = LRUCache(persist_path=path, flush_every=3, flush_interval=3600)
+
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert stored_keys(path) == set()
+
+    cache.put("c", "3")
+    assert stored_keys(path) == {"a", "b", "c"}
+
+
+def test_store_drops_expired_entries(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+
+    LRUCache(persist_path=path, flush_every=1).put("k", "v")
+    assert LRUCache(persist_path=path, max_age=0).get("k") is None
+    assert stored_keys(path) == set()
+
+
+def test_store_evicts_least_recently_used_past_its_size_cap(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+    cache = LRUCache(max_entries=1, persist_path=path, disk_max_bytes=300, flush_every=1)
+
+    for i in range(10):
+        cache.put(f"key{i}", "x" * 46)
+
+    keys = stored_keys(path)
+    assert len(keys) < 10
+    assert "key9" in keys and "key0" not in keys
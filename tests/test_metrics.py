@@ -0,0 +1,32 @@
+import asyncio
+
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api import main
+
+
+def histogram_state(endpoint):
+    return main.REQUEST_SECONDS._values.get(main.REQUEST_SECONDS._key({"endpoint": endpoint}))
+
+
+def test_unknown_languages_share_one_label():
+    assert main.language_label("hi") == "hi"
+    assert main.language_label("zz") == "other"
+
+
+def test_streamed_request_is_timed_until_the_body_ends():
+    async def slow_body():
+        for _ in range(3):
+            await asyncio.sleep(0.1)
+            yield b"{}\n"
+
+    main.app.add_api_route("/test-slow-stream", lambda: StreamingResponse(slow_body()))
+
+    with TestClient(main.app) as client:
+        assert client.get("/test-slow-stream").text == "{}\n" * 3
+
+    state = histogram_state("/test-slow-stream")
+    assert state["count"] == 1
+    assert state["sum"] >= 0.3
+    assert main.REQUESTS_IN_FLIGHT._values[main.REQUESTS_IN_FLIGHT._key({"endpoint": "/test-slow-stream"})] == 0
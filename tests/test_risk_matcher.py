@@ -0,0 +1,74 @@
+import re
+
+from api.main import CLAUSE_SEPARATORS, DESPAIR_PATTERNS, RISK_PATTERNS, RiskPhraseMatcher, risk_matcher
+
+
+def loop_trigger(text, sentiment, risk_patterns, despair_patterns):
+    """The per-clause loop RiskPhraseMatcher replaced: True when a phrase forces High."""
+    for clause in re.split(CLAUSE_SEPARATORS, text):
+        clause_lower = clause.lower()
+        if any(re.search(p, clause_lower) for p in risk_patterns):
+            return True
+        if any(p in clause_lower for p in despair_patterns):
+            return True
+
+    text_lower = text.lower()
+    if any(re.search(p, text_lower) for p in risk_patterns):
+        return True
+    return sentiment == "negative" and any(p in text_lower for p in despair_patterns)
+
+
+def corpus(phrases):
+    texts = [
+        "I had a good day at work.",
+        "The medication helped, but I am tired.",
+        "",
+    ]
+    for phrase in phrases:
+        words = phrase.split()
+        texts += [
+            phrase,
+            f"Honestly, {phrase.upper()} these days.",
+            f"It works. {phrase}!",
+            # Split across a clause boundary
+            f"{' '.join(words[:1])}, {' '.join(words[1:])}",
+            f"{phrase}ness aside",
+        ]
+    return texts
+
+
+def test_matches_the_clause_loop_on_the_shipped_patterns():
+    phrases = [p.replace("\\", "") for p in RISK_PATTERNS] + DESPAIR_PATTERNS
+
+    for text in corpus(phrases):
+        for sentiment in ("negative", "neutral", "positive"):
+            expected = loop_trigger(text, sentiment, RISK_PATTERNS, DESPAIR_PATTERNS)
+            assert (risk_matcher.trigger(text, sentiment) is not None) == expected, (text, sentiment)
+
+
+def test_cross_clause_risk_fires_regardless_of_mood():
+    matcher = RiskPhraseMatcher([r"end.*it"], [])
+
+    hit = matcher.trigger("I want to end, it all", "positive")
+
+    assert hit["kind"] == "risk" and not hit["in_clause"]
+    assert loop_trigger("I want to end, it all", "positive", [r"end.*it"], [])
+
+
+def test_cross_clause_despair_needs_negative_mood():
+    matcher = RiskPhraseMatcher([], ["empty, alone"])
+    text = "I feel empty, alone"
+
+    for sentiment in ("negative", "neutral", "positive"):
+        expected = loop_trigger(text, sentiment, [], ["empty, alone"])
+        assert (matcher.trigger(text, sentiment) is not None) == expected
+    assert matcher.trigger(text, "negative")["kind"] == "despair"
+    assert matcher.trigger(text, "neutral") is None
+
+
+def test_clause_hit_wins_over_earlier_cross_clause_hit():
+    matcher = RiskPhraseMatcher([r"end.*it"], ["so tired"])
+
+    hit = matcher.trigger("end, it. I am so tired", "positive")
+
+    assert hit["pattern"] == "so tired"
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from api.ttl_cache import TTLCache
+
+
+def test_failed_load_is_not_cached():
+    calls = []
+
+    def loader(query):
+        calls.append(query)
+        if len(calls) == 1:
+            raise RuntimeError("quota exceeded")
+        return ["video"]
+
+    cache = TTLCache(loader, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        cache.get("q", "q")
+    assert cache.get("q", "q") == ["video"]
+    assert len(calls) == 2
+
+
+def test_failed_reload_serves_last_good_value():
+    results = [["video"], RuntimeError("HTTP 503")]
+
+    def loader():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    cache = TTLCache(loader, ttl=0.01, stale_ttl=0)
+    assert cache.get("q") == ["video"]
+
+    time.sleep(0.02)
+    assert cache.get("q") == ["video"]
+
+
+def test_concurrent_misses_share_one_load():
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    cache = TTLCache(loader, ttl=60)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get("q"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert out == ["value"] * 8
+    assert len(calls) == 1